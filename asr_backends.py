@@ -0,0 +1,244 @@
+# Speech recognition backends behind one interface
+import json
+import sys
+import threading
+import time
+import numpy as np
+
+# Whisper decode settings. "command" is tuned for short spoken commands:
+# greedy decoding at a fixed temperature (no fallback retries), no previous
+# text conditioning, fp32 on CPU and, for the single-window fast path, no
+# timestamp tokens.
+WHISPER_PROFILES = {
+    "command": {
+        "temperature": 0.0,
+        "beam_size": None,
+        "best_of": None,
+        "condition_on_previous_text": False,
+        "without_timestamps": True,
+        "fp16": False,
+    },
+    "dictation": {
+        "fp16": False,
+    },
+}
+
+class ASRBackend:
+    # transcribe(audio) -> text, segments(audio, prompt) -> [(start, end, text)]
+    # for the streaming transcriber, stream() -> incremental recognizer for
+    # engines that produce partial results natively. transcribe_batch() is one
+    # call per clip unless the engine can decode several at once.
+    name = ""
+    sample_rate = 16000
+
+    def load(self):
+        return self
+
+    def transcribe(self, audio_float32, prompt=None):
+        return " ".join(text.strip() for _, _, text in self.segments(audio_float32, prompt)).strip()
+
+    def transcribe_batch(self, audios, prompt=None):
+        return [self.transcribe(audio, prompt) for audio in audios]
+
+    def segments(self, audio_float32, prompt=None):
+        raise NotImplementedError
+
+    def stream(self):
+        raise NotImplementedError(f"{self.name} has no native streaming mode")
+
+    def warm_up(self):
+        self.transcribe(np.zeros(self.sample_rate, dtype=np.float32))
+
+class SerializedBackend(ASRBackend):
+    # Lets any number of threads share one loaded model by running one decode
+    # at a time. openai-whisper installs kv-cache hooks on the model for every
+    # decode, so two decodes on the same model at once corrupt each other.
+    # Native streams (Vosk) get a recognizer each and are not locked.
+    def __init__(self, backend):
+        self.backend = backend
+        self.name = backend.name
+        self.sample_rate = backend.sample_rate
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio_float32, prompt=None):
+        with self._lock:
+            return self.backend.transcribe(audio_float32, prompt)
+
+    def transcribe_batch(self, audios, prompt=None):
+        with self._lock:
+            return self.backend.transcribe_batch(audios, prompt)
+
+    def segments(self, audio_float32, prompt=None):
+        with self._lock:
+            return self.backend.segments(audio_float32, prompt)
+
+    def stream(self):
+        return self.backend.stream()
+
+    def warm_up(self):
+        with self._lock:
+            self.backend.warm_up()
+
+class WhisperBackend(ASRBackend):
+    name = "whisper"
+
+    def __init__(self, model_name="base", language="en", profile="command"):
+        self.model_name = model_name
+        self.language = language
+        self.profile = profile
+        self.model = None
+
+    def load(self):
+        import whisper
+        self.model = whisper.load_model(self.model_name)  # whisper CPU-only
+        return self
+
+    def transcribe(self, audio_float32, prompt=None):
+        import whisper
+        if self.profile == "command" and len(audio_float32) <= whisper.audio.N_SAMPLES:
+            return self._decode_window(audio_float32, prompt)
+        return super().transcribe(audio_float32, prompt)
+
+    def _decode_window(self, audio_float32, prompt=None):
+        # One decode call on one 30 s window, skipping transcribe()'s seek loop.
+        # The mel is computed for the actual audio only and zero-padded to the
+        # fixed length the encoder requires, as transcribe() does per window.
+        import whisper
+        mel = whisper.log_mel_spectrogram(audio_float32, self.model.dims.n_mels)
+        mel = whisper.pad_or_trim(mel, whisper.audio.N_FRAMES).to(self.model.device)
+        return whisper.decode(self.model, mel, self._decoding_options(prompt)).text.strip()
+
+    def _decoding_options(self, prompt=None):
+        import whisper
+        options = WHISPER_PROFILES["command"]
+        return whisper.DecodingOptions(language=self.language,
+                                       temperature=options["temperature"],
+                                       without_timestamps=options["without_timestamps"],
+                                       fp16=options["fp16"],
+                                       prompt=prompt)
+
+    def transcribe_batch(self, audios, prompt=None):
+        # Every clip is one padded 30 s window anyway, so clips are stacked
+        # into a (batch, n_mels, frames) tensor and go through the encoder and
+        # the greedy decoder together
+        import torch
+        import whisper
+        if self.profile != "command" or len(audios) < 2 or \
+           any(len(audio) > whisper.audio.N_SAMPLES for audio in audios):
+            return super().transcribe_batch(audios, prompt)
+        mels = torch.stack([whisper.pad_or_trim(whisper.log_mel_spectrogram(audio, self.model.dims.n_mels),
+                                                whisper.audio.N_FRAMES)
+                            for audio in audios]).to(self.model.device)
+        return [result.text.strip() for result in whisper.decode(self.model, mels, self._decoding_options(prompt))]
+
+    def segments(self, audio_float32, prompt=None):
+        # Segment timestamps are needed here (the streaming transcriber commits
+        # by segment), so timestamp decoding stays on.
+        options = dict(WHISPER_PROFILES[self.profile], without_timestamps=False)
+        result = self.model.transcribe(audio_float32, language=self.language,
+                                       initial_prompt=prompt, **options)
+        return [(seg["start"], seg["end"], seg["text"]) for seg in result["segments"]]
+
+class FasterWhisperBackend(ASRBackend):
+    # CTranslate2 Whisper with int8 weights; several times faster than fp32
+    # PyTorch Whisper on CPU.
+    name = "faster-whisper"
+
+    def __init__(self, model_name="base", compute_type="int8", language="en", cpu_threads=0):
+        self.model_name = model_name
+        self.compute_type = compute_type
+        self.language = language
+        self.cpu_threads = cpu_threads
+        self.model = None
+
+    def load(self):
+        from faster_whisper import WhisperModel
+        self.model = WhisperModel(self.model_name, device="cpu",
+                                  compute_type=self.compute_type,
+                                  cpu_threads=self.cpu_threads)
+        return self
+
+    def segments(self, audio_float32, prompt=None):
+        segments, _ = self.model.transcribe(audio_float32, language=self.language,
+                                            initial_prompt=prompt, beam_size=1,
+                                            temperature=0.0,
+                                            condition_on_previous_text=False)
+        return [(seg.start, seg.end, seg.text) for seg in segments]
+
+class VoskStream:
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+
+    def accept(self, pcm_bytes):
+        # Feed int16 PCM; returns the final text when Vosk closes an utterance
+        if self.recognizer.AcceptWaveform(pcm_bytes):
+            return json.loads(self.recognizer.Result()).get("text", "").strip()
+        return None
+
+    def partial(self):
+        return json.loads(self.recognizer.PartialResult()).get("partial", "").strip()
+
+    def final(self):
+        return json.loads(self.recognizer.FinalResult()).get("text", "").strip()
+
+class VoskBackend(ASRBackend):
+    name = "vosk"
+
+    def __init__(self, model_path="vosk-model-en-us-0.22-lgraph"):
+        self.model_path = model_path
+        self.model = None
+
+    def load(self):
+        import vosk
+        self.model = vosk.Model(self.model_path)
+        return self
+
+    def stream(self):
+        import vosk
+        return VoskStream(vosk.KaldiRecognizer(self.model, self.sample_rate))
+
+    def segments(self, audio_float32, prompt=None):
+        pcm = (np.clip(audio_float32, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+        recognizer = self.stream()
+        texts = []
+        for start in range(0, len(pcm), 8000):
+            texts.append(recognizer.accept(pcm[start:start + 8000]))
+        texts.append(recognizer.final())
+        text = " ".join(t for t in texts if t)
+        return [(0.0, len(audio_float32) / self.sample_rate, text)] if text else []
+
+ASR_BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+    VoskBackend.name: VoskBackend,
+}
+
+def create_backend(name, **options):
+    if name not in ASR_BACKENDS:
+        raise ValueError(f"Unknown ASR backend: {name}")
+    return ASR_BACKENDS[name](**options).load()
+
+def benchmark(backend, audio_float32, runs=5):
+    # Returns (median seconds, real-time factor) of backend.transcribe
+    backend.transcribe(audio_float32)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        backend.transcribe(audio_float32)
+        timings.append(time.perf_counter() - start)
+    median = float(np.median(timings))
+    return median, median / (len(audio_float32) / backend.sample_rate)
+
+if __name__ == "__main__":
+    # python asr_backends.py command.wav [model_name]
+    # Compares the Whisper decode profiles on a 16 kHz mono recording.
+    import soundfile as sf
+    audio, rate = sf.read(sys.argv[1], dtype="float32")
+    if rate != 16000:
+        sys.exit("Expected a 16 kHz recording")
+    model_name = sys.argv[2] if len(sys.argv) > 2 else "base"
+    backend = WhisperBackend(model_name).load()
+    for profile in WHISPER_PROFILES:
+        backend.profile = profile
+        median, rtf = benchmark(backend, audio)
+        print(f"{profile:>10}: {median * 1000:7.1f} ms  RTF {rtf:.3f}  -> {backend.transcribe(audio)}")
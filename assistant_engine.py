@@ -0,0 +1,316 @@
+# Headless assistant: models, command routing, LLM and TTS without any UI
+import os
+import queue
+import threading
+import time
+import numpy as np
+import requests
+from asr_backends import create_backend, SerializedBackend
+from audio_buffer import AudioRingBuffer
+from audio_pipeline import QueueCapture
+from backend_client import BackendClient
+from batch_scheduler import TranscriptionScheduler
+from endpointing import Endpointer
+from intent_router import IntentRouter, load_sentence_embedder
+from medium_assist_commands import INTENT_EXAMPLES, match_command, process_command, route_intent, STATIC_RESPONSES
+from model_registry import ModelRegistry
+from ollama_client import OllamaSession, ResponseCache, split_sentences, stream_to_speech
+from tracing import Tracer
+from tts_cache import TTSCache
+from tts_client import synthesize
+from voice_pipeline import VoicePipeline
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "voice-assist")
+
+class AssistantEngine:
+    # Everything the assistant does apart from audio I/O and widgets: the
+    # models (loaded once and shared by every client), command and intent
+    # routing, the Ollama session, and TTS with its cache. The Tk app drives
+    # it in-process; EngineSession serves one remote client.
+    def __init__(self, sample_rate=16000, frame_samples=512, vad_batch_frames=1,
+                 asr_backend="whisper", asr_options=None,
+                 asr_batching=False, asr_max_batch=8, asr_max_wait_seconds=0.01,
+                 ollama_url="http://localhost:11434/api/generate", ollama_model="llama3.2:1b",
+                 llm_fallback=True, llm_timeout=(3.05, 60), llm_keep_alive="10m",
+                 llm_session_idle_seconds=120, llm_cache_entries=128, llm_cache_ttl_seconds=600,
+                 tts_url="http://localhost:5002/api/tts", tts_speaker="p228", tts_timeout=(3.05, 30),
+                 backend_retries=2, tts_cache_dir=os.path.join(CACHE_DIR, "tts"),
+                 tts_cache_memory_bytes=32 * 1024 * 1024, tts_cache_disk_bytes=256 * 1024 * 1024,
+                 intent_routing=True, intent_model="sentence-transformers/all-MiniLM-L6-v2",
+                 intent_threshold=0.7, intent_cache_dir=os.path.join(CACHE_DIR, "intents"),
+                 no_action_response="No action set for this command yet.",
+                 trace_file=None, max_traces=100, on_trace=None, on_status=None):
+        self.sample_rate = sample_rate
+        self.frame_samples = frame_samples
+        self.vad_batch_frames = vad_batch_frames
+        self.asr_backend = asr_backend
+        self.asr_options = asr_options or {}
+        self.asr_batching = asr_batching
+        self.asr_max_batch = asr_max_batch
+        self.asr_max_wait_seconds = asr_max_wait_seconds
+        self.llm_fallback = llm_fallback
+        self.tts_url = tts_url
+        self.tts_speaker = tts_speaker
+        self.intent_routing = intent_routing
+        self.intent_model = intent_model
+        self.intent_threshold = intent_threshold
+        self.intent_cache_dir = intent_cache_dir
+        self.no_action_response = no_action_response
+        self.max_traces = max_traces
+
+        self.ollama_url = ollama_url
+        self.ollama_model = ollama_model
+        self.llm_keep_alive = llm_keep_alive
+        self.llm_session_idle_seconds = llm_session_idle_seconds
+        self.llm_client = BackendClient(timeout=llm_timeout, retries=backend_retries, max_concurrency=1)
+        self.llm_cache = ResponseCache(llm_cache_entries, llm_cache_ttl_seconds)
+        self.llm_session = self.new_llm_session()
+        self.tts_client = BackendClient(timeout=tts_timeout, retries=backend_retries, max_concurrency=2)
+        self.tts_cache = TTSCache(tts_cache_dir, tts_cache_memory_bytes, tts_cache_disk_bytes)
+        if trace_file:
+            os.makedirs(os.path.dirname(trace_file), exist_ok=True)
+        self.tracer = Tracer(max_traces, trace_file, on_finish=on_trace)
+
+        # "vad" is the in-process client's VAD; sessions load their own since
+        # Silero keeps per-stream state
+        self.models = ModelRegistry(on_status=on_status)
+        self.models.register("vad", self.load_vad, self.warm_up_vad)
+        self.models.register("asr", self.load_asr, lambda backend: backend.warm_up())
+        if intent_routing:
+            self.models.register("intents", self.load_intent_router)
+
+    # Models are imported on first load (torch, Silero and the ASR engine
+    # are slow to import)
+    def load_vad(self):
+        import torch
+        torch.set_num_threads(1)
+        from silero_vad import load_silero_vad
+        from vad_engine import VadEngine
+        return VadEngine(load_silero_vad(), self.sample_rate, self.frame_samples, self.vad_batch_frames)
+
+    def warm_up_vad(self, engine):
+        list(engine.score([np.zeros(self.frame_samples, dtype=np.float32)] * self.vad_batch_frames))
+        engine.reset()
+
+    def load_asr(self):
+        # One model serves every client, so decodes from different sessions
+        # (streaming passes and final transcriptions) are serialized. With
+        # batching, concurrent final transcriptions share one
+        # encoder/decoder pass.
+        backend = SerializedBackend(create_backend(self.asr_backend, **self.asr_options.get(self.asr_backend, {})))
+        if self.asr_batching:
+            return TranscriptionScheduler(backend, self.asr_max_batch, self.asr_max_wait_seconds).start()
+        return backend
+
+    def load_intent_router(self):
+        return IntentRouter(load_sentence_embedder(self.intent_model), INTENT_EXAMPLES,
+                            threshold=self.intent_threshold, cache_dir=self.intent_cache_dir,
+                            model_name=self.intent_model).load()
+
+    def set_asr_backend(self, name):
+        previous = self.models.get("asr") if self.models.is_ready("asr") else None
+        if isinstance(previous, TranscriptionScheduler):
+            previous.stop()
+        self.asr_backend = name
+        self.models.register("asr", self.load_asr, lambda backend: backend.warm_up())
+        self.models.load_async(["asr"])
+
+    def new_llm_session(self):
+        # Every client keeps its own conversation; the reply cache is shared
+        # (its keys include the conversation history)
+        return OllamaSession(self.llm_client, self.ollama_url, self.ollama_model,
+                             keep_alive=self.llm_keep_alive,
+                             idle_reset_seconds=self.llm_session_idle_seconds,
+                             cache=self.llm_cache)
+
+    def set_ollama_model(self, model):
+        self.ollama_model = model
+        self.llm_session.set_model(model)
+
+    def new_endpointer(self, is_complete=None, **settings):
+        return Endpointer(self.frame_samples / self.sample_rate, is_complete=is_complete, **settings)
+
+    def pipeline(self, vad, endpointer, buffer, **options):
+        return VoicePipeline(vad, self.models.get("asr"), endpointer, buffer,
+                             frame_samples=self.frame_samples, **options)
+
+    def handle_command(self, text, tracer=None):
+        # Registry first, then the intent router (skipped, not waited for,
+        # until its model is loaded); None if neither knows the request
+        with (tracer or self.tracer).span("command"):
+            reply = process_command(text)
+            if not reply and self.intent_routing and self.models.is_ready("intents"):
+                reply = route_intent(self.models.get("intents"), text)
+        return reply
+
+    def synthesize(self, text, tracer=None):
+        key = TTSCache.key(text, speaker_id=self.tts_speaker)
+        cached = self.tts_cache.get(key)
+        if cached:
+            return cached
+        with (tracer or self.tracer).span("tts"):
+            result = synthesize(self.tts_client, self.tts_url, text, speaker_id=self.tts_speaker)
+        self.tts_cache.put(key, result)
+        return result
+
+    def prewarm_tts(self, texts=()):
+        self.tts_cache.prewarm([self.no_action_response] + list(texts) + STATIC_RESPONSES,
+                               lambda text: synthesize(self.tts_client, self.tts_url, text, speaker_id=self.tts_speaker),
+                               speaker_id=self.tts_speaker)
+
+    def generate(self, prompt, tracer=None, llm_session=None):
+        try:
+            with (tracer or self.tracer).span("llm"):
+                return (llm_session or self.llm_session).generate(prompt)
+        except requests.Timeout:
+            return "Response took too long."
+        except requests.RequestException as e:
+            return f"Request error: {str(e)}"
+        except Exception as e:
+            return f"Unexpected error: {str(e)}"
+
+    def ask_llm(self, prompt, speak, cancel_event=None, tokens=None, tracer=None, llm_session=None):
+        # Speaks the reply sentence by sentence while Ollama is still
+        # generating; tokens may come from elsewhere (e.g. a speculation)
+        tracer = tracer or self.tracer
+        try:
+            if tokens is None:
+                tokens = (llm_session or self.llm_session).stream(prompt, cancel_event=cancel_event)
+            tokens = tracer.first_item("llm_first_token", tokens)
+            # Includes speaking the reply, which is also traced on its own
+            with tracer.span("llm"):
+                return stream_to_speech(split_sentences(tokens), speak, cancel_event=cancel_event)
+        except requests.Timeout:
+            reply = "Response took too long."
+        except requests.RequestException as e:
+            reply = f"Request error: {str(e)}"
+        except Exception as e:
+            reply = f"Unexpected error: {str(e)}"
+        speak(reply)
+        return reply
+
+    def respond(self, text, speak, cancel_event=None, tracer=None, llm_session=None):
+        reply = self.handle_command(text, tracer)
+        if reply:
+            speak(reply)
+            return reply
+        if self.llm_fallback:
+            return self.ask_llm(text, speak, cancel_event, tracer=tracer, llm_session=llm_session)
+        speak(self.no_action_response)
+        return self.no_action_response
+
+    def close(self):
+        self.llm_client.close()
+        self.tts_client.close()
+
+class EngineSession:
+    # One remote client. PCM pushed with push() is endpointed and transcribed
+    # on the session's own thread with its own VAD state; everything that
+    # happens is reported through emit(event, audio=None) as JSON-able dicts:
+    # partial/final transcripts, reply sentences with their synthesized audio
+    # (int16 PCM bytes), status and errors.
+    def __init__(self, engine, emit, max_utterance_seconds=30, **endpointing):
+        self.engine = engine
+        self.emit = emit
+        self.capture = QueueCapture(engine.sample_rate, engine.frame_samples)
+        self.buffer = AudioRingBuffer(max_utterance_seconds, engine.sample_rate)
+        self.partial = ""
+        self.endpointer = engine.new_endpointer(is_complete=lambda: match_command(self.partial, fuzzy=False) is not None,
+                                                **endpointing)
+        # Its own tracer, since sessions run concurrently; finished traces
+        # also go to the engine's
+        self.tracer = Tracer(engine.max_traces, on_finish=engine.tracer.add)
+        self.llm_session = engine.new_llm_session()
+        self.cancel_event = threading.Event()
+        self._respond_lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def push(self, pcm):
+        self.capture.push(pcm)
+
+    def ask(self, text):
+        # A typed request, answered without going through ASR
+        threading.Thread(target=self._respond, args=(text,), daemon=True).start()
+
+    def interrupt(self):
+        self.cancel_event.set()
+
+    def close(self):
+        self._running = False
+        self.cancel_event.set()
+        self.capture.stop()
+        if self._thread:
+            self._thread.join()
+
+    def _on_partial(self, text):
+        self.partial = text
+        self.emit({"type": "partial", "text": text})
+
+    def _speak(self, text):
+        if self.cancel_event.is_set():
+            return
+        self.emit({"type": "reply", "text": text})
+        try:
+            pcm, rate, channels, sampwidth = self.engine.synthesize(text, self.tracer)
+        except Exception as e:
+            self.emit({"type": "error", "message": f"TTS error: {e}"})
+            return
+        if self.cancel_event.is_set():
+            # Interrupted while synthesizing
+            return
+        self.emit({"type": "audio", "rate": rate, "channels": channels, "sampwidth": sampwidth}, pcm)
+
+    def _respond(self, text):
+        with self._respond_lock:
+            self.cancel_event.clear()
+            self.tracer.begin()
+            try:
+                self.engine.respond(text, self._speak, self.cancel_event, self.tracer, self.llm_session)
+            except Exception as e:
+                self.emit({"type": "error", "message": str(e)})
+                time.sleep(1.0)
+            finally:
+                self.tracer.finish()
+
+    def _run(self):
+        try:
+            vad = self.engine.load_vad()
+        except Exception as e:
+            self.emit({"type": "error", "message": f"VAD failed to load: {e}"})
+            return
+        self.emit({"type": "status", "state": "listening"})
+        while self._running:
+            self.partial = ""
+            try:
+                # Partials always stream. Streaming tails carry each
+                # utterance's own prompt and never batch together, so a
+                # batching engine decodes the whole utterance at the end.
+                pipeline = self.engine.pipeline(vad, self.endpointer, self.buffer,
+                                                stream_tail=not self.engine.asr_batching,
+                                                on_partial=self._on_partial)
+                try:
+                    pipeline.listen(self.capture, keep_listening=lambda: self._running)
+                except queue.Empty:
+                    # The client stopped sending audio; start over when it resumes
+                    pipeline.cancel()
+                    continue
+                speech = pipeline.speech()
+                if not speech or not self._running:
+                    pipeline.cancel()
+                    continue
+                text = pipeline.transcribe(speech)
+                self.emit({"type": "final", "text": text})
+                if text:
+                    self._respond(text)
+                # Audio sent while replying was not meant for the next utterance
+                self.capture.drain()
+            except Exception as e:
+                self.emit({"type": "error", "message": str(e)})
+                time.sleep(1.0)
@@ -0,0 +1,101 @@
+# WebSocket front end for AssistantEngine: one warm model set, many thin clients
+#
+#   python assistant_server.py [--host 127.0.0.1] [--port 8765] [--metrics-port 9464]
+#
+# Client -> server:
+#   binary messages: 16 kHz mono int16 PCM, any chunk size
+#   text messages:   {"type": "ask", "text": "..."}  typed request, no ASR
+#                    {"type": "interrupt"}           stop the current reply
+# Server -> client (text, JSON):
+#   {"type": "status", "state": "listening"}
+#   {"type": "partial" | "final" | "reply", "text": "..."}
+#   {"type": "audio", "rate", "channels", "sampwidth"}, followed by one
+#   binary message with the PCM of the reply sentence
+#   {"type": "error", "message": "..."}
+import argparse
+import asyncio
+import json
+import sys
+from assistant_engine import AssistantEngine, EngineSession
+from tracing import serve_metrics
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+async def handle_client(engine, websocket):
+    loop = asyncio.get_running_loop()
+    outgoing = asyncio.Queue()
+
+    def emit(event, audio=None):
+        # Called from the session's threads
+        loop.call_soon_threadsafe(outgoing.put_nowait, (event, audio))
+
+    async def send_events():
+        while True:
+            event, audio = await outgoing.get()
+            await websocket.send(json.dumps(event))
+            if audio is not None:
+                await websocket.send(audio)
+
+    session = EngineSession(engine, emit).start()
+    sender = asyncio.create_task(send_events())
+    try:
+        async for message in websocket:
+            if isinstance(message, bytes):
+                session.push(message)
+                continue
+            try:
+                request = json.loads(message)
+            except ValueError:
+                emit({"type": "error", "message": "Expected JSON"})
+                continue
+            if request.get("type") == "ask":
+                session.ask(request.get("text", ""))
+            elif request.get("type") == "interrupt":
+                session.interrupt()
+            else:
+                emit({"type": "error", "message": f"Unknown request type: {request.get('type')}"})
+    finally:
+        sender.cancel()
+        await loop.run_in_executor(None, session.close)
+
+async def serve(engine, host, port):
+    # *args: older websockets releases also pass the request path
+    async with websockets.serve(lambda websocket, *args: handle_client(engine, websocket), host, port):
+        print(f"✅ Serving on ws://{host}:{port}")
+        await asyncio.Future()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the voice assistant over WebSocket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--asr", default="whisper")
+    parser.add_argument("--no-batching", action="store_true",
+                        help="decode each final transcript on its own instead of batching concurrent ones "
+                             "(partial transcripts stream either way)")
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0,
+                        help="how long a transcription may wait for others to batch with")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus text at /metrics")
+    args = parser.parse_args(argv)
+    if websockets is None:
+        sys.exit("assistant_server needs the websockets package: pip install websockets")
+
+    engine = AssistantEngine(asr_backend=args.asr,
+                             asr_batching=not args.no_batching,
+                             asr_max_batch=args.max_batch,
+                             asr_max_wait_seconds=args.max_wait_ms / 1000,
+                             on_status=lambda name, state: print(f"🔄 {name}: {state}"))
+    if args.metrics_port:
+        serve_metrics(engine.tracer, args.metrics_port)
+    engine.models.load_async(["asr", "intents"] if engine.intent_routing else ["asr"])
+    try:
+        asyncio.run(serve(engine, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# Preallocated audio ring buffer shared by capture, VAD, playback and ASR
+import numpy as np
+
+class AudioRingBuffer:
+    # Every sample is stored twice (at i and i + capacity), so the most recent
+    # samples are always one contiguous slice and can be handed out as numpy
+    # views without joining or copying. Samples are converted to float32 once,
+    # on write.
+    def __init__(self, max_seconds=30.0, sample_rate=16000):
+        self.sample_rate = sample_rate
+        self.capacity = int(max_seconds * sample_rate)
+        self._int16 = np.zeros(2 * self.capacity, dtype=np.int16)
+        self._float32 = np.zeros(2 * self.capacity, dtype=np.float32)
+        self._end = 0
+        self._size = 0
+        self.total_written = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def duration(self):
+        return self._size / self.sample_rate
+
+    @property
+    def start(self):
+        # Absolute index of the oldest sample still held
+        return self.total_written - self._size
+
+    def clear(self):
+        self._end = 0
+        self._size = 0
+        self.total_written = 0
+
+    def write(self, data):
+        # Accepts raw int16 bytes or an int16 array; returns a float32 view of
+        # the samples just written.
+        samples = np.frombuffer(data, dtype=np.int16) if isinstance(data, (bytes, bytearray, memoryview)) else data
+        self.total_written += len(samples)
+        samples = samples[-self.capacity:]
+        count = len(samples)
+        first = min(count, self.capacity - self._end)
+        self._store(self._end, samples[:first])
+        self._store(0, samples[first:])
+        self._end = (self._end + count) % self.capacity
+        self._size = min(self.capacity, self._size + count)
+        return self.float32(count)
+
+    def _store(self, pos, samples):
+        if not len(samples):
+            return
+        end = pos + len(samples)
+        self._int16[pos:end] = samples
+        self._int16[pos + self.capacity:end + self.capacity] = samples
+        np.multiply(samples, 1 / 32768, out=self._float32[pos:end], casting="unsafe")
+        self._float32[pos + self.capacity:end + self.capacity] = self._float32[pos:end]
+
+    def _slice(self, last):
+        last = self._size if last is None else max(0, min(last, self._size))
+        stop = self._end + self.capacity
+        return slice(stop - last, stop)
+
+    def int16(self, last=None):
+        return self._int16[self._slice(last)]
+
+    def float32(self, last=None):
+        return self._float32[self._slice(last)]
+
+    def float32_since(self, index):
+        # View of every sample from absolute index `index` (clamped to the oldest held)
+        return self.float32(self.total_written - max(index, self.start))
+
+    def tobytes(self):
+        return self.int16().tobytes()
@@ -0,0 +1,117 @@
+# Capture -> processing pipeline stages
+import queue
+import pyaudio
+
+class AudioCapture:
+    # Reads the microphone on PyAudio's callback thread and hands frames to the
+    # consumer through a bounded queue, so a slow consumer loses frames visibly
+    # instead of overflowing the device buffer silently.
+    def __init__(self, audio, rate=16000, frames_per_buffer=512, channels=1,
+                 format=pyaudio.paInt16, max_queued_frames=64):
+        self.audio = audio
+        self.rate = rate
+        self.frames_per_buffer = frames_per_buffer
+        self.channels = channels
+        self.format = format
+        self.frames = queue.Queue(maxsize=max_queued_frames)
+        self.stream = None
+        self.captured_frames = 0
+        self.dropped_frames = 0
+        self.overflowed_frames = 0
+
+    def _callback(self, in_data, frame_count, time_info, status_flags):
+        self.captured_frames += 1
+        if status_flags & pyaudio.paInputOverflow:
+            self.overflowed_frames += 1
+        try:
+            self.frames.put_nowait(in_data)
+        except queue.Full:
+            self.dropped_frames += 1
+        return (None, pyaudio.paContinue)
+
+    def start(self):
+        self.stream = self.audio.open(format=self.format,
+                                      channels=self.channels,
+                                      rate=self.rate,
+                                      input=True,
+                                      frames_per_buffer=self.frames_per_buffer,
+                                      stream_callback=self._callback)
+        self.stream.start_stream()
+        return self
+
+    def read(self, timeout=1.0):
+        # Raises queue.Empty if the device stopped delivering audio
+        return self.frames.get(timeout=timeout)
+
+    def drain(self):
+        # Discard frames queued while nobody was consuming (e.g. during TTS)
+        while True:
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                return
+
+    def stop(self):
+        if self.stream:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+
+    def stats(self):
+        return {
+            "captured": self.captured_frames,
+            "dropped": self.dropped_frames,
+            "overflowed": self.overflowed_frames,
+            "queued": self.frames.qsize(),
+        }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+class QueueCapture:
+    # The consumer side of AudioCapture for audio pushed from elsewhere (e.g.
+    # a network client): int16 PCM of any size is cut into frames_per_buffer
+    # frames. Like AudioCapture, frames are dropped when the queue is full.
+    def __init__(self, rate=16000, frames_per_buffer=512, max_queued_frames=256):
+        self.rate = rate
+        self.frames_per_buffer = frames_per_buffer
+        self.frames = queue.Queue(maxsize=max_queued_frames)
+        self.captured_frames = 0
+        self.dropped_frames = 0
+        self._pending = b""
+
+    def push(self, pcm):
+        frame_bytes = self.frames_per_buffer * 2
+        self._pending += pcm
+        while len(self._pending) >= frame_bytes:
+            frame, self._pending = self._pending[:frame_bytes], self._pending[frame_bytes:]
+            self.captured_frames += 1
+            try:
+                self.frames.put_nowait(frame)
+            except queue.Full:
+                self.dropped_frames += 1
+
+    def read(self, timeout=1.0):
+        return self.frames.get(timeout=timeout)
+
+    def drain(self):
+        while True:
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                return
+
+    def stop(self):
+        self.drain()
+        self._pending = b""
+
+    def stats(self):
+        return {
+            "captured": self.captured_frames,
+            "dropped": self.dropped_frames,
+            "overflowed": 0,
+            "queued": self.frames.qsize(),
+        }
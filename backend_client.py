@@ -0,0 +1,55 @@
+# Pooled HTTP client shared by the LLM and TTS backends
+import contextlib
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+class BackendClient:
+    # One keep-alive session per backend, with connect/read timeouts, retries
+    # with exponential backoff on connection errors and 502/503/504, and a cap
+    # on concurrent requests so a burst cannot pile up on a local server.
+    def __init__(self, timeout=(3.05, 60), retries=2, backoff=0.3,
+                 max_concurrency=2, pool_size=4):
+        self.timeout = timeout
+        self.session = requests.Session()
+        # Only failures where the server cannot have started on the request are
+        # retried. A read timeout on a POST may mean a generation is still
+        # running, so it surfaces as requests.Timeout instead of resending.
+        retry = Retry(total=retries,
+                      connect=retries,
+                      read=False,
+                      other=0,
+                      status=retries,
+                      backoff_factor=backoff,
+                      status_forcelist=(502, 503, 504),
+                      allowed_methods=frozenset({"GET", "POST"}),
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def request(self, method, url, timeout=None, **kwargs):
+        with self._slots:
+            return self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    @contextlib.contextmanager
+    def stream(self, method, url, timeout=None, **kwargs):
+        # Holds a concurrency slot until the streamed body has been consumed
+        with self._slots:
+            res = self.session.request(method, url, stream=True,
+                                       timeout=timeout or self.timeout, **kwargs)
+            try:
+                yield res
+            finally:
+                res.close()
+
+    def close(self):
+        self.session.close()
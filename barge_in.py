@@ -0,0 +1,59 @@
+# Barge-in: keep VAD running while the assistant talks
+import queue
+import threading
+from audio_buffer import AudioRingBuffer
+
+class BargeInMonitor:
+    # Watches the microphone during playback. A frame only counts as the user
+    # talking if VAD fires and the mic is clearly louder than what the speaker
+    # is playing (echo_ratio), for min_frames frames in a row.
+    def __init__(self, capture, vad, player, threshold=0.5, echo_ratio=2.0,
+                 min_frames=6, preroll_seconds=0.5, on_barge_in=None):
+        self.capture = capture
+        self.vad = vad
+        self.player = player
+        self.threshold = threshold
+        self.echo_ratio = echo_ratio
+        self.min_frames = min_frames
+        self.on_barge_in = on_barge_in
+        self.recent_audio = AudioRingBuffer(preroll_seconds, capture.rate)
+        self.triggered = False
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.capture.drain()
+        self.vad.reset()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        streak = 0
+        while not self._stopped.is_set():
+            try:
+                audio_chunk = self.capture.read(timeout=0.1)
+            except queue.Empty:
+                continue
+            audio_float32 = self.recent_audio.write(audio_chunk)
+            echo_rms = self.player.output_rms
+            for confidence, mic_rms in self.vad.push(audio_float32):
+                if confidence >= self.threshold and mic_rms > self.echo_ratio * echo_rms:
+                    streak += 1
+                else:
+                    streak = 0
+            if streak >= self.min_frames:
+                print("✋ Barge-in detected")
+                self.triggered = True
+                if self.on_barge_in:
+                    self.on_barge_in()
+                return
+
+    def preroll(self):
+        # The audio that triggered the barge-in, so the next utterance keeps its start
+        return self.recent_audio.int16().copy()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
@@ -0,0 +1,114 @@
+# Batches concurrent transcription requests into shared decoder passes
+import collections
+import concurrent.futures
+import threading
+import time
+
+class TranscriptionScheduler:
+    # Stands in for an ASR backend. transcribe() calls from any number of
+    # threads are queued; a worker takes up to max_batch of them with the same
+    # prompt, waiting at most max_wait_seconds after the oldest arrived for
+    # others to join, and runs one backend.transcribe_batch() for all of them.
+    # A lone request therefore costs at most max_wait_seconds extra. Streaming
+    # segments() and stream() go straight to the backend.
+    def __init__(self, backend, max_batch=8, max_wait_seconds=0.01):
+        self.backend = backend
+        self.name = backend.name
+        self.sample_rate = backend.sample_rate
+        self.max_batch = max_batch
+        self.max_wait_seconds = max_wait_seconds
+        self.batches = 0
+        self.requests = 0
+        self._pending = collections.deque()
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._thread:
+            self._thread.join()
+        while self._pending:
+            _, _, _, future = self._pending.popleft()
+            future.cancel()
+
+    def submit(self, audio_float32, prompt=None):
+        future = concurrent.futures.Future()
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError("Transcription scheduler is stopped")
+            self._pending.append((time.perf_counter(), audio_float32, prompt, future))
+            self._condition.notify()
+        return future
+
+    def transcribe(self, audio_float32, prompt=None):
+        return self.submit(audio_float32, prompt).result()
+
+    def transcribe_batch(self, audios, prompt=None):
+        futures = [self.submit(audio, prompt) for audio in audios]
+        return [future.result() for future in futures]
+
+    def segments(self, audio_float32, prompt=None):
+        return self.backend.segments(audio_float32, prompt)
+
+    def stream(self):
+        return self.backend.stream()
+
+    def warm_up(self):
+        self.backend.warm_up()
+
+    def mean_batch_size(self):
+        return self.requests / self.batches if self.batches else 0.0
+
+    def _same_prompt(self, prompt):
+        return sum(1 for _, _, other, _ in self._pending if other == prompt)
+
+    def _take_batch(self):
+        # Called with the condition held
+        while not self._pending and not self._stopped:
+            self._condition.wait()
+        if self._stopped:
+            return None, []
+        arrived, _, prompt, _ = self._pending[0]
+        deadline = arrived + self.max_wait_seconds
+        while not self._stopped and self._same_prompt(prompt) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            self._condition.wait(remaining)
+        batch, rest = [], collections.deque()
+        for item in self._pending:
+            if item[2] == prompt and len(batch) < self.max_batch:
+                batch.append(item)
+            else:
+                rest.append(item)
+        self._pending = rest
+        return prompt, batch
+
+    def _run(self):
+        while True:
+            with self._condition:
+                prompt, batch = self._take_batch()
+            if not batch:
+                return
+            runnable = [(audio, future) for _, audio, _, future in batch
+                        if future.set_running_or_notify_cancel()]
+            if not runnable:
+                continue
+            self.batches += 1
+            self.requests += len(runnable)
+            try:
+                texts = self.backend.transcribe_batch([audio for audio, _ in runnable], prompt)
+            except Exception as e:
+                for _, future in runnable:
+                    future.set_exception(e)
+                continue
+            for (_, future), text in zip(runnable, texts):
+                future.set_result(text)
@@ -0,0 +1,199 @@
+# Command registry with a keyword prefilter and fuzzy fallback
+import collections
+import difflib
+import json
+import re
+import webbrowser
+
+class KeywordAutomaton:
+    # Aho-Corasick automaton: finds every registered keyword in one pass over
+    # the text, however many keywords there are. Only whole-word hits count.
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self._built = True
+
+    def add(self, keyword, value):
+        state = 0
+        for char in keyword:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+        self._output[state].append((len(keyword), value))
+        self._built = False
+
+    def build(self):
+        pending = collections.deque(self._goto[0].values())
+        for state in pending:
+            self._fail[state] = 0
+        while pending:
+            state = pending.popleft()
+            for char, nxt in self._goto[state].items():
+                pending.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(char, 0)
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+        self._built = True
+
+    def find(self, text):
+        if not self._built:
+            self.build()
+        found = set()
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, value in self._output[state]:
+                start = end + 1 - length
+                if (start == 0 or not text[start - 1].isalnum()) and \
+                   (end + 1 == len(text) or not text[end + 1].isalnum()):
+                    found.add(value)
+        return found
+
+class Command:
+    def __init__(self, name, patterns, keywords, handler, early=False, responses=()):
+        self.name = name
+        self.patterns = [re.compile(p) if isinstance(p, str) else p for p in patterns]
+        self.keywords = [k.lower() for k in keywords]
+        self.handler = handler
+        self.early = early          # safe to run from a partial transcript
+        self.responses = list(responses)
+
+class CommandRegistry:
+    # Commands declare keywords; a command is only tried when one of its
+    # keywords is in the text, so matching cost follows the text length and
+    # the few candidate commands rather than the size of the registry.
+    # Commands without keywords are always tried.
+    def __init__(self, fuzzy_cutoff=0.8):
+        self.commands = []
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self._automaton = None
+        self._always = []
+
+    def add(self, command):
+        self.commands.append(command)
+        self._automaton = None
+        return command
+
+    def command(self, *patterns, keywords=(), early=False, responses=()):
+        # Decorator: @registry.command(r"\bopen (youtube)\b", keywords=["youtube"])
+        def register(handler):
+            self.add(Command(handler.__name__, patterns, keywords, handler, early, responses))
+            return handler
+        return register
+
+    def load_config(self, path):
+        # JSON list of {"name", "patterns", "keywords", "response", "url", "early"}
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+        for entry in entries:
+            self.add(Command(entry["name"], entry["patterns"], entry.get("keywords", []),
+                             _config_handler(entry.get("response", ""), entry.get("url")),
+                             entry.get("early", False),
+                             [entry["response"]] if "response" in entry and "{" not in entry["response"] else []))
+
+    def _index(self):
+        if self._automaton is None:
+            automaton = KeywordAutomaton()
+            self._always = []
+            for position, command in enumerate(self.commands):
+                for keyword in command.keywords:
+                    automaton.add(keyword, position)
+                if not command.keywords:
+                    self._always.append(position)
+            automaton.build()
+            self._automaton = automaton
+        return self._automaton
+
+    def candidates(self, text_lc):
+        positions = self._index().find(text_lc) | set(self._always)
+        return [self.commands[position] for position in sorted(positions)]
+
+    def match(self, text, fuzzy=True):
+        # Returns (command, match) for the first registered command that
+        # matches, or None. fuzzy=False for hot paths such as endpointing.
+        text_lc = text.lower()
+        for command in self.candidates(text_lc):
+            for pattern in command.patterns:
+                match = pattern.search(text_lc)
+                if match:
+                    return command, match
+        if fuzzy:
+            return self.match_fuzzy(text_lc)
+        return None
+
+    def match_early(self, text):
+        # For partial transcripts: only an exact, unambiguous hit on a command
+        # marked early is returned, never a fuzzy one. Several commands may
+        # share a handler (an anchored early pattern next to a looser one);
+        # they count as one action.
+        text_lc = text.lower()
+        hits = []
+        for command in self.candidates(text_lc):
+            for pattern in command.patterns:
+                match = pattern.search(text_lc)
+                if match:
+                    hits.append((command, match))
+                    break
+        early = [hit for hit in hits if hit[0].early]
+        if early and len({command.handler for command, _ in hits}) == 1:
+            return early[0]
+        return None
+
+    def match_fuzzy(self, text_lc):
+        # Fallback for ASR typos in a final transcript: rewrites a window of
+        # whole words into a keyword it nearly spells ("you tube" -> "youtube",
+        # "goggle" -> "google"), and accepts the result only when a pattern of
+        # the command that owns the keyword matches the whole corrected
+        # utterance. A sentence that merely contains a similar word
+        # ("research", "times") never turns into a command.
+        words = re.findall(r"[\w']+", text_lc)
+        fixes = []
+        for command in self.commands:
+            for keyword in command.keywords:
+                for ratio, span in self._typo_spans(words, keyword):
+                    fixes.append((ratio, command, keyword, span))
+        fixes.sort(key=lambda fix: fix[0], reverse=True)
+        for _, command, keyword, (start, end) in fixes:
+            corrected = " ".join(words[:start] + [keyword] + words[end:])
+            for pattern in command.patterns:
+                match = pattern.fullmatch(corrected)
+                if match:
+                    return command, match
+        return None
+
+    def _typo_spans(self, words, keyword):
+        # (ratio, (start, end)) for each word window that is a near miss of
+        # keyword. Windows that contain the keyword whole are inflections or
+        # other words ("times", "research"), not typos.
+        target = keyword.replace(" ", "")
+        size = len(keyword.split())
+        for width in (size, size + 1):
+            for start in range(len(words) - width + 1):
+                window = words[start:start + width]
+                if " ".join(window) == keyword:
+                    continue
+                joined = "".join(window)
+                if joined == target:
+                    yield 1.0, (start, start + width)
+                    continue
+                if target in joined:
+                    continue
+                ratio = difflib.SequenceMatcher(None, joined, target).ratio()
+                if ratio >= self.fuzzy_cutoff:
+                    yield ratio, (start, start + width)
+
+def _config_handler(response, url=None):
+    def handler(match):
+        groups = match.groups()
+        if url:
+            webbrowser.open(url.format(*groups))
+        return response.format(*groups)
+    return handler
@@ -0,0 +1,87 @@
+# Adaptive end-of-utterance detection
+import numpy as np
+
+class Endpointer:
+    # Decides when the user has finished speaking from per-frame VAD
+    # confidence and RMS:
+    # - hysteresis: speech starts at `threshold` but only ends once confidence
+    #   drops below `threshold - hysteresis`
+    # - a running noise-floor estimate from non-speech frames; a frame only
+    #   starts speech if it is `noise_margin_db` above the floor
+    # - adaptive hangover: `short_grace_seconds` of silence ends the utterance
+    #   when is_complete() says what was said so far already makes sense
+    #   (e.g. it matches a command), `grace_seconds` otherwise
+    # Durations are kept in seconds and converted on use, so configure() takes
+    # effect immediately, even mid-utterance.
+    def __init__(self, frame_seconds, threshold=0.5, hysteresis=0.15,
+                 grace_seconds=1.5, short_grace_seconds=0.4,
+                 no_speech_timeout_seconds=3.0, noise_margin_db=6.0,
+                 noise_adapt_rate=0.05, is_complete=None):
+        self.frame_seconds = frame_seconds
+        self.threshold = threshold
+        self.hysteresis = hysteresis
+        self.grace_seconds = grace_seconds
+        self.short_grace_seconds = short_grace_seconds
+        self.no_speech_timeout_seconds = no_speech_timeout_seconds
+        self.noise_margin_db = noise_margin_db
+        self.noise_adapt_rate = noise_adapt_rate
+        self.is_complete = is_complete
+        self.reset()
+
+    def configure(self, **settings):
+        for name, value in settings.items():
+            if not hasattr(self, name):
+                raise AttributeError(f"Unknown endpointing setting: {name}")
+            setattr(self, name, value)
+
+    def reset(self, speech_detected=False):
+        self.speech_detected = speech_detected
+        self.in_speech = speech_detected
+        self.noise_floor = None
+        self.frames = 0
+        self.silent_frames = 0
+        self.reason = ""
+
+    def _frames(self, seconds):
+        return max(1, int(round(seconds / self.frame_seconds)))
+
+    def noise_floor_db(self):
+        return 20 * np.log10((self.noise_floor or 0) + 1e-6)
+
+    def update(self, confidence, rms):
+        # Feed one frame; returns True once the utterance is over
+        self.frames += 1
+        level_db = 20 * np.log10(rms + 1e-6)
+        if self.in_speech:
+            voiced = confidence >= self.threshold - self.hysteresis
+        else:
+            loud_enough = self.noise_floor is None or level_db >= self.noise_floor_db() + self.noise_margin_db
+            voiced = confidence >= self.threshold and loud_enough
+
+        if not voiced:
+            if self.noise_floor is None:
+                self.noise_floor = rms
+            else:
+                self.noise_floor += self.noise_adapt_rate * (rms - self.noise_floor)
+
+        if voiced:
+            self.in_speech = True
+            self.speech_detected = True
+            self.silent_frames = 0
+            return False
+
+        self.in_speech = False
+        if not self.speech_detected:
+            if self.frames >= self._frames(self.no_speech_timeout_seconds):
+                self.reason = f"no speech for {self.no_speech_timeout_seconds}s"
+                return True
+            return False
+
+        self.silent_frames += 1
+        if self.silent_frames >= self._frames(self.short_grace_seconds) and self.is_complete and self.is_complete():
+            self.reason = f"complete after {self.short_grace_seconds}s of silence"
+            return True
+        if self.silent_frames >= self._frames(self.grace_seconds):
+            self.reason = f"{self.grace_seconds}s of silence"
+            return True
+        return False
@@ -0,0 +1,70 @@
+# Embedding-based intent routing, tried before falling back to the LLM
+import functools
+import hashlib
+import json
+import os
+import numpy as np
+
+def load_sentence_embedder(model_name="sentence-transformers/all-MiniLM-L6-v2"):
+    # Small CPU sentence encoder; returns embed(texts) -> unit-length rows
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(model_name, device="cpu")
+
+    def embed(texts):
+        return model.encode(list(texts), normalize_embeddings=True,
+                            convert_to_numpy=True).astype(np.float32)
+    return embed
+
+class IntentRouter:
+    # intents: {canonical command text: [example utterances]}. The examples
+    # are embedded once and cached on disk, keyed by model and examples; a
+    # transcript is routed to the intent of its nearest example by cosine
+    # similarity (one matrix-vector product), or to None below threshold.
+    def __init__(self, embed, intents, threshold=0.75, cache_dir=None, model_name=""):
+        self.embed = embed
+        self.intents = intents
+        self.threshold = threshold
+        self.cache_dir = cache_dir
+        self.model_name = model_name
+        self.labels = []
+        self.matrix = None
+
+    def _cache_path(self):
+        if not self.cache_dir:
+            return None
+        key = json.dumps([self.model_name, sorted(self.intents.items())], sort_keys=True)
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"intents-{digest}.npy")
+
+    def load(self):
+        examples = []
+        self.labels = []
+        for intent, utterances in self.intents.items():
+            for utterance in [intent] + list(utterances):
+                examples.append(utterance.lower())
+                self.labels.append(intent)
+        path = self._cache_path()
+        if path and os.path.exists(path):
+            self.matrix = np.load(path)
+        else:
+            self.matrix = self.embed(examples)
+            if path:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                np.save(path, self.matrix)
+        return self
+
+    @functools.lru_cache(maxsize=256)
+    def _embed_one(self, text):
+        return self.embed([text])[0]
+
+    def route(self, text):
+        # Returns (intent or None, similarity)
+        text = text.strip().lower()
+        if not text or self.matrix is None:
+            return None, 0.0
+        scores = self.matrix @ self._embed_one(text)
+        best = int(np.argmax(scores))
+        score = float(scores[best])
+        if score < self.threshold:
+            return None, score
+        return self.labels[best], score
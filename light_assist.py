@@ -1,30 +1,67 @@
+from asr_backends import VoskBackend
+import os
+from audio_buffer import AudioRingBuffer
 import queue
 import sounddevice as sd
-import soundfile as sf
-import numpy as np  # make sure this is imported at the top
-import vosk
 import sys
-import json
 import pyttsx3
+from intent_router import IntentRouter, load_sentence_embedder
+from medium_assist_commands import INTENT_EXAMPLES, match_partial, process_command, route_intent
+from model_registry import ModelRegistry
 import requests
+from backend_client import BackendClient
+from ollama_client import OllamaSession, ResponseCache, split_sentences, stream_to_speech
 import threading
+import time
 import tkinter as tk
-import webbrowser
-import datetime
-import tempfile
-import os
+from tracing import Tracer
 
 # CONFIG
 VOSK_MODEL_PATH = "vosk-model-en-us-0.22-lgraph"
 OLLAMA_MODEL = "llama3.2:1b"
 OLLAMA_URL = "http://localhost:11434/api/generate"
+LLM_TIMEOUT = (3.05, 10)
+LLM_KEEP_ALIVE = "10m"
+LLM_SESSION_IDLE_SECONDS = 120
+LLM_CACHE_ENTRIES = 128
+LLM_CACHE_TTL_SECONDS = 600
+PRELOAD_LLM = True
+TRACE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "voice-assist", "light-traces.jsonl")
+MAX_UTTERANCE_SECONDS = 30
+EARLY_DISPATCH = True
+INTENT_ROUTING = True
+INTENT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+INTENT_THRESHOLD = 0.7
+INTENT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "voice-assist", "intents")
 
 # INIT
-model = vosk.Model(VOSK_MODEL_PATH)
 q = queue.Queue()
+llm_client = BackendClient(timeout=LLM_TIMEOUT, max_concurrency=1)
+llm_session = OllamaSession(llm_client, OLLAMA_URL, OLLAMA_MODEL, keep_alive=LLM_KEEP_ALIVE,
+                            idle_reset_seconds=LLM_SESSION_IDLE_SECONDS,
+                            cache=ResponseCache(LLM_CACHE_ENTRIES, LLM_CACHE_TTL_SECONDS))
 engine = pyttsx3.init()
 last_transcription = ""
-last_audio_data = bytearray()
+last_audio_data = AudioRingBuffer(MAX_UTTERANCE_SECONDS, 16000)
+os.makedirs(os.path.dirname(TRACE_FILE), exist_ok=True)
+tracer = Tracer(jsonl_path=TRACE_FILE, on_finish=lambda trace: show_latency(trace))
+
+# MODELS
+# The Vosk model is large, so it loads in the background after the window is up
+def report_model_status(name, state):
+    if state == "loading":
+        update_status(f"⏳ Loading {name} model...")
+    elif state == "ready":
+        update_status("Ready")
+    else:
+        update_status(f"❌ {name} {state}")
+
+models = ModelRegistry(on_status=report_model_status)
+models.register("vosk", lambda: VoskBackend(VOSK_MODEL_PATH).load(), lambda backend: backend.warm_up())
+if INTENT_ROUTING:
+    models.register("intents", lambda: IntentRouter(load_sentence_embedder(INTENT_MODEL), INTENT_EXAMPLES,
+                                                    threshold=INTENT_THRESHOLD, cache_dir=INTENT_CACHE_DIR,
+                                                    model_name=INTENT_MODEL).load())
 
 # SETUP VOICE
 def configure_voice():
@@ -39,25 +76,55 @@ def callback(indata, frames, time, status):
         print(status, file=sys.stderr)
     q.put(bytes(indata))
 
+def preload_llm():
+    # Loads the model while the user is still talking, so the reply only pays
+    # for generation
+    try:
+        llm_session.preload()
+    except Exception as e:
+        print(f"⚠️ LLM preload failed: {e}")
+
 def capture_speech():
-    global last_transcription, last_audio_data
+    global last_transcription
     update_status("🎤 Listening...")
+    if PRELOAD_LLM:
+        threading.Thread(target=preload_llm, daemon=True).start()
+    tracer.begin("capture")
+    asr_seconds = 0.0
+    early_reply = None
+    # Drop audio queued after the last stream closed
+    while True:
+        try:
+            q.get_nowait()
+        except queue.Empty:
+            break
     try:
-        last_audio_data = bytearray()
+        last_audio_data.clear()
+        rec = models.get("vosk").stream()
         with sd.RawInputStream(samplerate=16000, blocksize=8000, dtype='int16',
                                channels=1, callback=callback):
-            rec = vosk.KaldiRecognizer(model, 16000)
             last_transcription = ""
             while True:
                 try:
                     data = q.get(timeout=1.5)
-                    last_audio_data.extend(data)
-                    if rec.AcceptWaveform(data):
-                        result = json.loads(rec.Result())
-                        text = result.get("text", "").strip()
-                        if text:
-                            last_transcription = text
-                            print(f"🗣 You said: {text}")
+                    last_audio_data.write(data)
+                    start = time.perf_counter()
+                    text = rec.accept(data)
+                    asr_seconds += time.perf_counter() - start
+                    if text:
+                        last_transcription = text
+                        print(f"🗣 You said: {text}")
+                        break
+                    if EARLY_DISPATCH:
+                        partial = rec.partial()
+                        early_command = match_partial(partial) if partial else None
+                        if early_command:
+                            # Simple commands run straight from the partial result
+                            last_transcription = partial
+                            print(f"⚡ Early command match on partial: {partial}")
+                            handler, match = early_command
+                            with tracer.span("command"):
+                                early_reply = handler(match)
                             break
                 except queue.Empty:
                     print("⌛ Timeout waiting for speech")
@@ -65,47 +132,47 @@ def capture_speech():
                 except Exception as e:
                     print(f"❌ Error during speech capture: {e}")
                     break
+        # Spoken with the microphone closed, so the reply doesn't end up in q
+        if early_reply:
+            speak(early_reply)
     except Exception as e:
         print(f"❌ Microphone error: {e}")
+    tracer.record("asr", asr_seconds * 1000)
+    tracer.finish()
     update_status("✅ Done")
 
 def analyze_command(text):
-    text = text.lower()
-    if "open youtube" in text:
-        webbrowser.open("https://youtube.com")
-        return "Opening YouTube."
-    elif "open google" in text:
-        webbrowser.open("https://google.com")
-        return "Opening Google."
-    elif "what time is it" in text:
-        now = datetime.datetime.now().strftime("%I:%M %p")
-        return f"The current time is {now}."
-    return None
-
-def ask_llama(prompt):
+    # Shares medium_assist's command registry; paraphrases go through the
+    # intent router before anything is sent to the LLM
+    with tracer.span("command"):
+        reply = process_command(text)
+        if not reply and INTENT_ROUTING and models.is_ready("intents"):
+            reply = route_intent(models.get("intents"), text)
+    return reply
+
+def ask_llama_streaming(prompt):
+    # Speaks the reply sentence by sentence while Ollama is still generating
     update_status("🧠 Thinking...")
-    payload = {
-        "model": OLLAMA_MODEL,
-        "prompt": prompt,
-        "stream": False
-    }
     try:
-        res = requests.post(OLLAMA_URL, json=payload, timeout=10)
-        res.raise_for_status()
-        return res.json()["response"]
+        tokens = tracer.first_item("llm_first_token", llm_session.stream(prompt))
+        with tracer.span("llm"):
+            return stream_to_speech(split_sentences(tokens), speak)
     except requests.Timeout:
-        return "Response took too long."
+        reply = "Response took too long."
     except requests.RequestException as e:
-        return f"Request error: {str(e)}"
+        reply = f"Request error: {str(e)}"
     except Exception as e:
-        return f"Unexpected error: {str(e)}"
+        reply = f"Unexpected error: {str(e)}"
     finally:
         update_status("✅ Done")
+    speak(reply)
+    return reply
 
 def speak(text):
     try:
-        engine.say(text)
-        engine.runAndWait()
+        with tracer.span("speak"):
+            engine.say(text)
+            engine.runAndWait()
     except Exception as e:
         print(f"🔊 TTS Error: {e}")
 
@@ -117,40 +184,42 @@ def on_respond_to_speech():
         speak("No speech captured yet.")
         return
     print(f"🔁 Processing captured speech: {last_transcription}")
-    reply = analyze_command(last_transcription)
-    if not reply:
-        reply = ask_llama(last_transcription)
-    if reply:
+    tracer.begin("respond")
+    try:
+        reply = analyze_command(last_transcription)
+        if reply:
+            speak(reply)
+            return
+        reply = ask_llama_streaming(last_transcription)
         print(f"🤖 LLM: {reply}")
-        speak(reply)
+    finally:
+        tracer.finish()
 
 def on_playback_audio():
-    if not last_audio_data:
+    if not len(last_audio_data):
         speak("No audio captured yet.")
         return
     try:
-        audio_np = np.frombuffer(last_audio_data, dtype=np.int16)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as f:
-            file_path = f.name
-            sf.write(file_path, audio_np, 16000, format='WAV', subtype='PCM_16')
-
-        print(f"▶️ Playing back from: {file_path}")
-        data, fs = sf.read(file_path, dtype='int16')
-        sd.play(data, fs)
+        print(f"▶️ Playing back {last_audio_data.duration:.1f}s of audio")
+        sd.play(last_audio_data.int16(), 16000)
         sd.wait()
-        os.remove(file_path)
     except Exception as e:
         print(f"❌ Error during playback: {e}")
         update_status("⚠️ Playback error")
 
 # GUI
 def update_status(text):
-    status_label.config(text=text)
+    window.after(0, lambda: status_label.config(text=text))
+
+def show_latency(trace):
+    stages = " · ".join(f"{name} {ms:.0f}" for name, ms in trace.totals().items())
+    text = f"⏱ {trace.name}: {stages} ms (total {trace.duration_ms:.0f} ms)"
+    window.after(0, lambda: latency_label.config(text=text))
 
 configure_voice()
 window = tk.Tk()
 window.title("Light Assist — GUI Assistant")
-window.geometry("400x260")
+window.geometry("400x290")
 
 btn_capture = tk.Button(window, text="🎤 Process Speech", font=("Arial", 14), command=on_process_speech)
 btn_capture.pack(pady=10)
@@ -164,4 +233,8 @@ btn_playback.pack(pady=10)
 status_label = tk.Label(window, text="Ready", font=("Arial", 12), fg="green")
 status_label.pack(pady=10)
 
+latency_label = tk.Label(window, text="", font=("Arial", 9), fg="gray")
+latency_label.pack()
+
+models.load_async()
 window.mainloop()
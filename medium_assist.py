@@ -1,24 +1,30 @@
+from assistant_engine import AssistantEngine
+from audio_buffer import AudioRingBuffer
+from audio_pipeline import AudioCapture
+from asr_backends import ASR_BACKENDS
+from barge_in import BargeInMonitor
 import collections
-import io
-from medium_assist_commands import process_command
+from medium_assist_commands import match_command, match_partial
 import numpy as np
+from ollama_client import Speculation
 import os
+from playback_engine import PlaybackEngine
 # import pyttsx3
 import pyaudio
-import requests
 import sounddevice as sd
 import soundfile as sf
 import tempfile
 import threading
 import time
-from silero_vad import load_silero_vad
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import ttk
-import torch
-torch.set_num_threads(1)
-import wave
-import whisper
+from tracing import serve_metrics
+from ui_bus import UIBus
+try:
+    from wake_word import load_spotter
+except ImportError:
+    load_spotter = None
 
 # Configuration
 FORMAT = pyaudio.paInt16
@@ -26,26 +32,116 @@ CHANNELS = 1
 SAMPLE_RATE = 16000
 CHUNK = int(SAMPLE_RATE / 10)
 NUM_SAMPLES = 512
+MAX_QUEUED_FRAMES = 64
 CONFIDENCE_THRESHOLD = 0.5
+VAD_BATCH_FRAMES = 1  # frames per VAD sync; more only adds lag
 GRACE_SECONDS = 1.5
-MIN_FRAMES_BEFORE_CHECK = int(GRACE_SECONDS / (NUM_SAMPLES / SAMPLE_RATE))
-MIN_FRAMES_BEFORE_TRANSCRIBE = int(GRACE_SECONDS / (NUM_SAMPLES / SAMPLE_RATE))
+SHORT_GRACE_SECONDS = 0.4
+NO_SPEECH_TIMEOUT_SECONDS = 3.0
+VAD_HYSTERESIS = 0.15
+NOISE_MARGIN_DB = 6.0
+MAX_UTTERANCE_SECONDS = 30
+ASR_BACKEND = "whisper"
+ASR_OPTIONS = {
+    "whisper": {"model_name": "base", "profile": "command"},
+    "faster-whisper": {"model_name": "base", "compute_type": "int8"},
+    "vosk": {"model_path": "vosk-model-en-us-0.22-lgraph"},
+}
+STREAMING_TRANSCRIPTION = True
+TRIM_SILENCE = True
+EARLY_DISPATCH = True
+SPEECH_PAD_FRAMES = int(0.2 / (NUM_SAMPLES / SAMPLE_RATE))
+SPEECH_MERGE_GAP_FRAMES = int(0.5 / (NUM_SAMPLES / SAMPLE_RATE))
+STREAMING_STEP_SECONDS = 1.0
+WAKE_MODEL_PATH = "vosk-model-small-en-us-0.15"
+WAKE_PHRASE = "hey assistant"
+WAKE_HANGOVER_FRAMES = 16
+WAKE_PREROLL_SECONDS = 0.5
 # OLLAMA_URL = "https://5dfd-183-171-102-196.ngrok-free.app/api/generate"
 OLLAMA_URL = "http://localhost:11434/api/generate"
 # OLLAMA_MODEL = "deepseek-r1:8b"
 OLLAMA_MODEL = "llama3.2:1b"
-
+INTENT_ROUTING = True
+INTENT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+INTENT_THRESHOLD = 0.7
+INTENT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "voice-assist", "intents")
+LLM_FALLBACK = False
+LLM_TIMEOUT = (3.05, 60)
+LLM_KEEP_ALIVE = "10m"
+LLM_SESSION_IDLE_SECONDS = 120
+LLM_CACHE_ENTRIES = 128
+LLM_CACHE_TTL_SECONDS = 600
+SPECULATIVE_LLM = True
+SPECULATION_MIN_WORDS = 4
+SPECULATION_MIN_SIMILARITY = 0.85  # word-level match between speculated prompt and final transcript
+TTS_URL = "http://localhost:5002/api/tts"
+TTS_SPEAKER = "p228"
+TTS_TIMEOUT = (3.05, 30)
+BACKEND_RETRIES = 2
+TTS_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "voice-assist", "tts")
+TTS_CACHE_MEMORY_BYTES = 32 * 1024 * 1024
+TTS_CACHE_DISK_BYTES = 256 * 1024 * 1024
+TTS_PREWARM = True
+BARGE_IN = True
+BARGE_IN_ECHO_RATIO = 2.0
+BARGE_IN_MIN_FRAMES = 6
+TRACE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "voice-assist", "traces.jsonl")
+MAX_TRACES = 100
+METRICS_PORT = None  # e.g. 9464 to serve Prometheus text at /metrics
+FRAME_DEBUG_EVERY = 0  # print every Nth VAD frame; 0 = never
+UI_FPS = 25  # meter/status redraws per second; workers only publish the latest values
+NO_ACTION_RESPONSE = "No action set for this command yet."
+NO_AUDIO_RESPONSE = "No audio captured yet."
+
+# The window is one client of the engine, which holds the models, command
+# routing, the LLM session and TTS; audio I/O, wake word and barge-in stay here
+assistant = AssistantEngine(sample_rate=SAMPLE_RATE, frame_samples=NUM_SAMPLES,
+                            vad_batch_frames=VAD_BATCH_FRAMES,
+                            asr_backend=ASR_BACKEND, asr_options=ASR_OPTIONS,
+                            ollama_url=OLLAMA_URL, ollama_model=OLLAMA_MODEL,
+                            llm_fallback=LLM_FALLBACK, llm_timeout=LLM_TIMEOUT,
+                            llm_keep_alive=LLM_KEEP_ALIVE,
+                            llm_session_idle_seconds=LLM_SESSION_IDLE_SECONDS,
+                            llm_cache_entries=LLM_CACHE_ENTRIES,
+                            llm_cache_ttl_seconds=LLM_CACHE_TTL_SECONDS,
+                            tts_url=TTS_URL, tts_speaker=TTS_SPEAKER, tts_timeout=TTS_TIMEOUT,
+                            backend_retries=BACKEND_RETRIES, tts_cache_dir=TTS_CACHE_DIR,
+                            tts_cache_memory_bytes=TTS_CACHE_MEMORY_BYTES,
+                            tts_cache_disk_bytes=TTS_CACHE_DISK_BYTES,
+                            intent_routing=INTENT_ROUTING, intent_model=INTENT_MODEL,
+                            intent_threshold=INTENT_THRESHOLD, intent_cache_dir=INTENT_CACHE_DIR,
+                            no_action_response=NO_ACTION_RESPONSE,
+                            trace_file=TRACE_FILE, max_traces=MAX_TRACES,
+                            on_trace=lambda trace: show_latency(trace),
+                            on_status=lambda name, state: report_model_status(name, state))
+models = assistant.models
+tracer = assistant.tracer
 audio = pyaudio.PyAudio()
-sileroModel = load_silero_vad()
-whisperModel = whisper.load_model("base")  # whisper CPU-only
+player = PlaybackEngine(audio, rate=SAMPLE_RATE).start()
 # if using pyttsx3
 # engine = pyttsx3.init()
-last_audio_data = []
+last_audio_data = AudioRingBuffer(MAX_UTTERANCE_SECONDS, SAMPLE_RATE)
+if METRICS_PORT:
+    serve_metrics(tracer, METRICS_PORT)
+wake_spotter = None
+always_on = False
+llm_interrupt = threading.Event()
+reply_generation = None  # player generation of the reply in progress; a barge-in changes it
+latest_partial = ""
+early_command = None
+speculation = None
+endpointer = assistant.new_endpointer(is_complete=lambda: match_command(latest_partial, fuzzy=False) is not None,
+                                      threshold=CONFIDENCE_THRESHOLD,
+                                      hysteresis=VAD_HYSTERESIS,
+                                      grace_seconds=GRACE_SECONDS,
+                                      short_grace_seconds=SHORT_GRACE_SECONDS,
+                                      no_speech_timeout_seconds=NO_SPEECH_TIMEOUT_SECONDS,
+                                      noise_margin_db=NOISE_MARGIN_DB)
 
 # GUI
 root = tk.Tk()
 root.title("🧠 Talk To Me")
-root.geometry("400x400")
+root.geometry("400x500")
 style = ttk.Style()
 style.theme_use('default')
 
@@ -53,44 +149,67 @@ style.configure("green.Horizontal.TProgressbar", troughcolor='gray', background=
 style.configure("yellow.Horizontal.TProgressbar", troughcolor='gray', background='orange')
 style.configure("red.Horizontal.TProgressbar", troughcolor='gray', background='red')
 
+# Worker threads never touch widgets; they publish to the bus and the Tk
+# loop redraws at UI_FPS (see redraw_ui)
+ui_bus = UIBus(root, lambda changed: redraw_ui(changed), fps=UI_FPS)
+
 status_label = tk.Label(root, text="Ready", font=("Arial", 12))
 status_label.pack(pady=10)
 
 transcribe_label = tk.Label(root, text="", font=("Arial", 12))
 transcribe_label.pack(pady=10)
 
+latency_label = tk.Label(root, text="", font=("Arial", 9), fg="gray")
+latency_label.pack()
+
 spinner = tk.Label(root, text="", font=("Arial", 20))
 spinner.pack()
-spinner_running = False
+spinner_chars = ["⏳", "🔄", "🔁", "🔃"]
+spinner_job = None
 
 def start_spinner():
-    global spinner_running
-    spinner_running = True
-    spinner_chars = ["⏳", "🔄", "🔁", "🔃"]
-    def animate(i=0):
-        if spinner_running:
-            spinner.config(text=spinner_chars[i % len(spinner_chars)])
-            root.after(200, animate, i+1)
-        else:
-            spinner.config(text="")
-    animate()
+    ui_bus.publish(spinner=True)
 
 def stop_spinner():
-    global spinner_running
-    spinner_running = False
+    ui_bus.publish(spinner=False)
+
+def set_spinner(running):
+    # Tk thread only
+    global spinner_job
+    if spinner_job:
+        root.after_cancel(spinner_job)
+        spinner_job = None
+    if running:
+        animate_spinner()
+    else:
+        spinner.config(text="")
+
+def animate_spinner(i=0):
+    global spinner_job
+    spinner.config(text=spinner_chars[i % len(spinner_chars)])
+    spinner_job = root.after(200, animate_spinner, i + 1)
 
 def update_status(text):
-    root.after(0, lambda: status_label.config(text=text))
+    ui_bus.publish(status=text)
 
 def update_transcribed_text(text):
-    root.after(0, lambda: transcribe_label.config(text=text))
-
-def int2float(sound):
-    abs_max = np.abs(sound).max()
-    sound = sound.astype('float32')
-    if abs_max > 0:
-        sound *= 1 / 32768
-    return sound.squeeze()
+    ui_bus.publish(transcript=text)
+
+def show_latency(trace):
+    stages = " · ".join(f"{name} {ms:.0f}" for name, ms in trace.totals().items() if name != "capture")
+    typical = tracer.summary().get("total", {}).get("p50", 0)
+    text = f"⏱ {stages} ms\nlast {trace.duration_ms:.0f} ms, median {typical:.0f} ms"
+    ui_bus.publish(latency=text)
+
+# Models load in the background (torch, Silero and the ASR engine are
+# imported there too) so the window shows up immediately.
+def report_model_status(name, state):
+    if state == "loading":
+        update_status(f"⏳ Loading {name}...")
+    elif state != "ready":
+        update_status(f"❌ {name} {state}")
+    elif models.all_ready():
+        update_status("✅ Ready")
 
 # Functions
 def speak(text):
@@ -101,93 +220,166 @@ def speak(text):
     # except Exception as e:
     #     update_status(f"TTS Error: {e}")
 # if you are using coqui tts
+    # Taken before synthesizing: if the user barges in meanwhile, the audio is dropped
+    generation = player.generation if reply_generation is None else reply_generation
     try:
-        response = requests.get(
-            f"http://localhost:5002/api/tts?text={text}&speaker_id=p228&style_wav=&language_id=",
-            headers={"accept": "audio/wav"},
-        )
-        response.raise_for_status()
-        # audio_data = np.frombuffer(response.content, dtype=np.int16)
-        # play_stream = audio.open(format=FORMAT,
-        #                        channels=CHANNELS,
-        #                        rate=SAMPLE_RATE,
-        #                        output=True)
-        with io.BytesIO(response.content) as buffer:
-            with wave.open(buffer, 'rb') as wf:
-                channels = wf.getnchannels()
-                rate = wf.getframerate()
-                sampwidth = wf.getsampwidth()
-                audio_data = wf.readframes(wf.getnframes())
-
-        play_stream = audio.open(format=audio.get_format_from_width(sampwidth),
-                                channels=channels,
-                                rate=rate,
-                                output=True)
-        play_stream.write(audio_data)
-        play_stream.stop_stream()
-        play_stream.close()
+        audio_data, rate, channels, sampwidth = assistant.synthesize(text)
+        with tracer.span("playback"):
+            if player.play(audio_data, rate, channels, sampwidth, generation=generation):
+                player.wait()
     except Exception as e:
         update_status(f"❌ TTS error: {e}")
 
-def update_meters(confidence, volume_rms):
-    def set_vad_style(c):
-        if c > 0.75:
-            vad_bar.config(style="green.Horizontal.TProgressbar")
-        elif c > 0.5:
-            vad_bar.config(style="yellow.Horizontal.TProgressbar")
-        else:
-            vad_bar.config(style="red.Horizontal.TProgressbar")
-
-    root.after(0, lambda: confidence_label.config(text=f"VAD Confidence: {confidence:.2f}"))
-    root.after(0, lambda c=confidence: vad_bar.config(value=c))
-    set_vad_style(confidence)
-
-    db_val = min(100, 20 * np.log10(volume_rms + 1e-6) + 60)
-    root.after(0, lambda: volume_label.config(text=f"Volume: {db_val:.2f} dB"))
-    root.after(0, lambda v=db_val: volume_bar.config(value=v))
-
-def listen():
-    global is_listening
+def vad_style(confidence):
+    if confidence > 0.75:
+        return "green.Horizontal.TProgressbar"
+    if confidence > 0.5:
+        return "yellow.Horizontal.TProgressbar"
+    return "red.Horizontal.TProgressbar"
+
+def redraw_ui(changed):
+    # Runs on the Tk thread with the newest value of everything published
+    # since the last tick
+    if "status" in changed:
+        status_label.config(text=changed["status"])
+    if "transcript" in changed:
+        transcribe_label.config(text=changed["transcript"])
+    if "latency" in changed:
+        latency_label.config(text=changed["latency"])
+    if "spinner" in changed:
+        set_spinner(changed["spinner"])
+    if "listen_state" in changed:
+        listen_button.config(state=changed["listen_state"])
+    if "playback_state" in changed:
+        playback_button.config(state=changed["playback_state"])
+    if "confidence" in changed:
+        confidence = changed["confidence"]
+        confidence_label.config(text=f"VAD Confidence: {confidence:.2f}")
+        vad_bar.config(value=confidence)
+        style_name = vad_style(confidence)
+        if vad_bar.cget("style") != style_name:
+            vad_bar.config(style=style_name)
+    if "volume_rms" in changed:
+        db_val = max(0.0, min(100, 20 * np.log10(changed["volume_rms"] + 1e-6) + 60))
+        volume_label.config(text=f"Volume: {db_val:.2f} dB")
+        volume_bar.config(value=db_val)
+
+def report_frame(frame_index, confidence, volume_rms):
+    # Called per VAD frame on the capture thread: just overwrite the slots
+    ui_bus.publish(confidence=confidence, volume_rms=volume_rms)
+    tracer.observe("vad_confidence", confidence)
+    if FRAME_DEBUG_EVERY and frame_index % FRAME_DEBUG_EVERY == 0:
+        print(f"[Frame {frame_index}] Confidence: {confidence:.2f}")
+
+def open_capture():
+    return AudioCapture(audio, rate=SAMPLE_RATE, frames_per_buffer=NUM_SAMPLES,
+                        channels=CHANNELS, format=FORMAT,
+                        max_queued_frames=MAX_QUEUED_FRAMES).start()
+
+def listen(capture=None):
+    # Keeps the input stream open while responding so the user can barge in;
+    # an interruption starts the next utterance straight away.
+    owns_capture = capture is None
+    if owns_capture:
+        capture = open_capture()
+    try:
+        preroll = listen_once(capture)
+        while preroll is not None:
+            preroll = listen_once(capture, preroll)
+    finally:
+        if owns_capture:
+            capture.stop()
+
+def interrupt_response():
+    player.cancel()
+    llm_interrupt.set()
+
+def on_partial_transcript(text):
+    # Simple commands run as soon as a partial transcript matches them
+    # unambiguously, without waiting for the end of the utterance
+    global latest_partial, early_command, is_listening
+    latest_partial = text
+    update_transcribed_text(f"📝 {text}")
+    if EARLY_DISPATCH and early_command is None and is_listening:
+        early_command = match_partial(text)
+        if early_command:
+            print(f"⚡ Early command match on partial: {text}")
+            is_listening = False
+    if endpointer.speech_detected and not endpointer.in_speech:
+        # The user paused: the reply to what they said so far may be the answer
+        speculate(text)
+
+def preload_llm():
+    try:
+        assistant.llm_session.preload()
+    except Exception as e:
+        print(f"⚠️ LLM preload failed: {e}")
+
+def on_speech_start():
+    if SPECULATIVE_LLM and LLM_FALLBACK:
+        threading.Thread(target=preload_llm, daemon=True).start()
+
+def speculate(text):
+    # Starts generating the LLM reply from the full partial transcript
+    # (committed plus tentative text) while the user pauses and again at the
+    # endpoint, overlapping the LLM with the final decode. A speculation for
+    # an older partial is cancelled, which frees the LLM slot; the one close
+    # enough to the final transcript is spoken.
+    global speculation
+    if not (SPECULATIVE_LLM and LLM_FALLBACK) or early_command or len(text.split()) < SPECULATION_MIN_WORDS:
+        return
+    if match_command(text, fuzzy=False) is not None:
+        return
+    if speculation and speculation.matches(text):
+        return
+    if speculation:
+        speculation.cancel()
+    print(f"🔮 Speculating on: {text}")
+    speculation = Speculation(assistant.llm_session, text)
+
+def take_speculation(prompt):
+    # The running speculation if it was for this prompt; any other is cancelled
+    global speculation
+    current, speculation = speculation, None
+    if current and current.matches(prompt, SPECULATION_MIN_SIMILARITY):
+        return current
+    if current:
+        current.cancel()
+    return None
+
+def listen_once(capture, preroll=None):
+    # Returns the audio that interrupted the reply if the user barged in
+    global is_listening, latest_partial, early_command, reply_generation
     is_listening = True
-    last_audio_data.clear()
+    latest_partial = ""
+    early_command = None
+    take_speculation("")
+    tracer.begin()
+    if not models.all_ready():
+        update_status("⏳ Waiting for models...")
+    vad = models.get("vad")
+    pipeline = assistant.pipeline(vad, endpointer, last_audio_data,
+                                  threshold=CONFIDENCE_THRESHOLD,
+                                  streaming=STREAMING_TRANSCRIPTION,
+                                  trim_silence=TRIM_SILENCE,
+                                  pad_frames=SPEECH_PAD_FRAMES,
+                                  merge_gap_frames=SPEECH_MERGE_GAP_FRAMES,
+                                  step_seconds=STREAMING_STEP_SECONDS,
+                                  on_partial=on_partial_transcript,
+                                  on_frame=report_frame,
+                                  on_speech_start=on_speech_start)
     start_spinner()
-    stream = audio.open(format=FORMAT,
-                        channels=CHANNELS,
-                        rate=SAMPLE_RATE,
-                        input=True,
-                        frames_per_buffer=CHUNK)
     update_status("🎙 Listening...")
     print("✅ Started Listening")
 
-    frame_count = 0
-    voiced_confidences = []
-    low_confidence_streak = 0
-    confidence = 0
-    db_val = 0
-
     try:
-        while is_listening:
-            audio_chunk = stream.read(NUM_SAMPLES, exception_on_overflow=False)
-            last_audio_data.append(audio_chunk)
-            audio_int16 = np.frombuffer(audio_chunk, np.int16)
-            audio_float32 = int2float(audio_int16)
-            confidence = sileroModel(torch.from_numpy(audio_float32), SAMPLE_RATE).item()
-            voiced_confidences.append(confidence)
-            volume_rms = np.sqrt(np.mean(audio_float32**2))
-            db_val = min(100, 20 * np.log10(volume_rms + 1e-6) + 60)
-            update_meters(confidence, volume_rms)
-            print(f"[Frame {frame_count}] Confidence: {confidence:.2f}")
-            frame_count += 1
-
-            if frame_count >= MIN_FRAMES_BEFORE_CHECK:
-                if confidence < CONFIDENCE_THRESHOLD:
-                    low_confidence_streak += 1
-                else:
-                    low_confidence_streak = 0
-
-                if low_confidence_streak >= MIN_FRAMES_BEFORE_TRANSCRIBE:
-                    print(f"🛑 Confidence < {CONFIDENCE_THRESHOLD} for {GRACE_SECONDS}s, stopping...")
-                    break
+        with tracer.span("capture"):
+            reason = pipeline.listen(capture, preroll, lambda: is_listening)
+        tracer.record("vad", sum(pipeline.timings["vad_ms"]), frames=len(pipeline.confidences))
+        tracer.record("endpoint", endpointer.silent_frames * NUM_SAMPLES / SAMPLE_RATE * 1000)
+        if reason:
+            print(f"🛑 End of utterance ({reason}), stopping...")
+            speculate(latest_partial)
 
     except Exception as e:
         update_status(f"⚠️ Recording error: {e}")
@@ -195,85 +387,179 @@ def listen():
     finally:
         stop_spinner()
         print("✅ Stopped Listening")
-        stream.stop_stream()
-        stream.close()
+        stats = capture.stats()
+        print(f"📊 Capture stats: {stats}")
+        if stats["dropped"] or stats["overflowed"]:
+            print(f"⚠️ Lost audio: {stats['dropped']} dropped, {stats['overflowed']} overflowed frames")
         is_listening = False
-        confidence = 0
-        db_val = 0
-        root.after(0, lambda c=confidence: vad_bar.config(value=c))
-        root.after(0, lambda v=db_val: volume_bar.config(value=v))
-        root.after(0, lambda: confidence_label.config(text="VAD Confidence: 0.00"))
-        root.after(0, lambda: volume_label.config(text="Volume: 0.00 dB"))
-        root.after(0, lambda: listen_button.config(state=tk.NORMAL))
-    
-    if last_audio_data:
-        toTranscribe = b''.join(last_audio_data)
-        audio_np = np.frombuffer(toTranscribe, dtype=np.int16).astype(np.float32) / 32768.0
+        ui_bus.publish(confidence=0.0, volume_rms=0.0)
+        ui_bus.publish(listen_state=tk.NORMAL)
+
+    speech = pipeline.speech()
+    if len(last_audio_data) and not speech:
+        print("🤷 No speech detected, skipping transcription")
+        update_status("🤷 No speech detected")
+
+    if not speech:
+        pipeline.cancel()
+        take_speculation("")
+
+    monitor = None
+    if speech:
         try:
             update_status("🧠 Transcribing...")
-            transcribeResult = whisperModel.transcribe(audio_np, language="en")
-            transcribeText = transcribeResult["text"].strip()
+            transcribe_start = time.perf_counter()
+            if early_command:
+                pipeline.cancel()
+                transcribeText = latest_partial
+            else:
+                with tracer.span("transcribe"):
+                    transcribeText = pipeline.transcribe(speech)
+            speech_seconds = sum(e - s for s, e in speech) / SAMPLE_RATE
+            print(f"⏱ Transcribed {speech_seconds:.1f}s of {last_audio_data.duration:.1f}s captured in {(time.perf_counter() - transcribe_start) * 1000:.0f} ms")
             print("Recognized speech:", transcribeText)
             update_transcribed_text(f"📝 {transcribeText}")
-            action_response = process_command(transcribeText)
-            if not action_response:
-                speak('No action set for this command yet.')
-                # action_response = ask_llama(transcribeText)
-                return
-            speak(action_response)
+            llm_interrupt.clear()
+            reply_generation = player.generation
+            if BARGE_IN:
+                monitor = BargeInMonitor(capture, vad, player,
+                                         threshold=CONFIDENCE_THRESHOLD,
+                                         echo_ratio=BARGE_IN_ECHO_RATIO,
+                                         min_frames=BARGE_IN_MIN_FRAMES,
+                                         on_barge_in=interrupt_response).start()
+            if early_command:
+                handler, match = early_command
+                with tracer.span("command"):
+                    action_response = handler(match)
+            else:
+                action_response = assistant.handle_command(transcribeText)
+            if action_response:
+                take_speculation("")
+                speak(action_response)
+            elif LLM_FALLBACK:
+                ask_llama_streaming(transcribeText)
+            else:
+                speak(NO_ACTION_RESPONSE)
         except Exception as e:
             update_status(f"❌ Transcription error: {e}")
         finally:
-            root.after(0, lambda: playback_button.config(state=tk.NORMAL))    
+            reply_generation = None
+            if monitor:
+                monitor.stop()
+            ui_bus.publish(playback_state=tk.NORMAL)
+
+    tracer.finish()
+    if monitor and monitor.triggered:
+        return monitor.preroll()
+    return None
 
 def ask_llama(prompt):
     update_status("🧠 Thinking...")
-    payload = {
-        "model": OLLAMA_MODEL,
-        "prompt": prompt,
-        "stream": False
-    }
     try:
-        res = requests.post(OLLAMA_URL, json=payload, timeout=60)
-        res.raise_for_status()
-        return res.json()["response"]
-    except requests.Timeout:
-        return "Response took too long."
-    except requests.RequestException as e:
-        return f"Request error: {str(e)}"
-    except Exception as e:
-        return f"Unexpected error: {str(e)}"
+        return assistant.generate(prompt)
+    finally:
+        update_status("✅ Done")
+
+def ask_llama_streaming(prompt):
+    # Speaks the reply sentence by sentence while Ollama is still generating
+    update_status("🧠 Thinking...")
+    try:
+        tokens = None
+        prefetched = take_speculation(prompt)
+        if prefetched:
+            print("🔮 Using speculative reply")
+            tokens = prefetched.tokens(cancel_event=llm_interrupt)
+        return assistant.ask_llm(prompt, speak, llm_interrupt, tokens)
     finally:
         update_status("✅ Done")
 
 def on_start_listening():
-    listen_button.config(state=tk.DISABLED)
+    ui_bus.apply(listen_state=tk.DISABLED)
     threading.Thread(target=listen, daemon=True).start()
 
+def always_on_loop():
+    # One input stream stays open; only VAD runs until voiced audio contains
+    # the wake phrase, then the same stream is handed to listen().
+    vad = models.get("vad")
+    capture = open_capture()
+    recent_audio = AudioRingBuffer(WAKE_PREROLL_SECONDS, SAMPLE_RATE)
+    hangover = 0
+    vad.reset()
+    update_status(f"👂 Waiting for '{WAKE_PHRASE}'...")
+    print("✅ Always-on listening started")
+    try:
+        while always_on:
+            audio_chunk = capture.read()
+            audio_float32 = recent_audio.write(audio_chunk)
+            was_voiced = hangover > 0
+            for confidence, _ in vad.push(audio_float32):
+                if confidence >= CONFIDENCE_THRESHOLD:
+                    hangover = WAKE_HANGOVER_FRAMES
+                elif hangover > 0:
+                    hangover -= 1
+            if hangover <= 0:
+                continue
+            pcm = audio_chunk if was_voiced else recent_audio.tobytes()
+            if not wake_spotter.accept(pcm):
+                continue
+
+            print("👂 Wake word detected")
+            listen(capture)
+            if always_on:
+                ui_bus.publish(listen_state=tk.DISABLED)
+            capture.drain()
+            recent_audio.clear()
+            wake_spotter.reset()
+            vad.reset()
+            hangover = 0
+            if always_on:
+                update_status(f"👂 Waiting for '{WAKE_PHRASE}'...")
+    except Exception as e:
+        update_status(f"⚠️ Always-on error: {e}")
+    finally:
+        capture.stop()
+        print("✅ Always-on listening stopped")
+
+def on_toggle_always_on():
+    global always_on, wake_spotter
+    if always_on:
+        always_on = False
+        always_on_button.config(text="👂 Always On: Off")
+        ui_bus.apply(listen_state=tk.NORMAL)
+        update_status("Ready")
+        return
+    if load_spotter is None:
+        messagebox.showerror("Always On", "Install vosk to use wake word listening.")
+        return
+    try:
+        if wake_spotter is None:
+            wake_spotter = load_spotter(WAKE_MODEL_PATH, WAKE_PHRASE, SAMPLE_RATE)
+    except Exception as e:
+        messagebox.showerror("Always On", f"Could not load wake word model: {e}")
+        return
+    always_on = True
+    always_on_button.config(text="👂 Always On: On")
+    ui_bus.apply(listen_state=tk.DISABLED)
+    threading.Thread(target=always_on_loop, daemon=True).start()
+
 def playback():
-    if not last_audio_data:
-        speak("No audio captured yet.")
+    if not len(last_audio_data):
+        speak(NO_AUDIO_RESPONSE)
         return
     try:
-        playback_button.config(state=tk.DISABLED)
+        ui_bus.publish(playback_state=tk.DISABLED)
         start_spinner()
-        play_stream = audio.open(format=FORMAT,
-                        channels=CHANNELS,
-                        rate=SAMPLE_RATE,
-                        output=True)
-        for frame in last_audio_data:
-            play_stream.write(frame)
-        play_stream.stop_stream()
-        play_stream.close()
+        player.play(last_audio_data.int16().copy(), SAMPLE_RATE)
+        player.wait()
         update_status("✅ Playback completed")
     except Exception as e:
         update_status(f"⚠️ Playback error: {e}")
     finally:
-        root.after(0, lambda: playback_button.config(state=tk.NORMAL))
+        ui_bus.publish(playback_state=tk.NORMAL)
         stop_spinner()
 
 def on_start_playback():
-    playback_button.config(state=tk.DISABLED)
+    ui_bus.apply(playback_state=tk.DISABLED)
     threading.Thread(target=playback, daemon=True).start()
 
 def on_closing():
@@ -284,12 +570,15 @@ def on_closing():
     except Exception as e:
         print(f"Error during shutdown: {e}")
     finally:
+        ui_bus.stop()
+        player.stop()
+        assistant.close()
         root.destroy()
 
 def open_settings():
     settings_window = tk.Toplevel(root)
     settings_window.title("Settings")
-    settings_window.geometry("300x200")
+    settings_window.geometry("300x250")
 
     # Model name
     tk.Label(settings_window, text="LLM Model:").pack()
@@ -309,11 +598,21 @@ def open_settings():
     threshold_entry.insert(0, str(CONFIDENCE_THRESHOLD))
     threshold_entry.pack()
 
+    # Speech recognition engine
+    tk.Label(settings_window, text="ASR Engine:").pack()
+    asr_choice = tk.StringVar(value=ASR_BACKEND)
+    tk.OptionMenu(settings_window, asr_choice, *ASR_BACKENDS).pack()
+
     def save_settings():
-        global OLLAMA_MODEL, GRACE_SECONDS, CONFIDENCE_THRESHOLD
+        global OLLAMA_MODEL, GRACE_SECONDS, CONFIDENCE_THRESHOLD, ASR_BACKEND
         OLLAMA_MODEL = model_entry.get()
+        assistant.set_ollama_model(OLLAMA_MODEL)
         GRACE_SECONDS = float(grace_entry.get())
         CONFIDENCE_THRESHOLD = float(threshold_entry.get())
+        endpointer.configure(threshold=CONFIDENCE_THRESHOLD, grace_seconds=GRACE_SECONDS)
+        if asr_choice.get() != ASR_BACKEND:
+            ASR_BACKEND = asr_choice.get()
+            assistant.set_asr_backend(ASR_BACKEND)
         messagebox.showinfo("Settings", "Changes saved!")
         settings_window.destroy()
 
@@ -336,7 +635,14 @@ listen_button = tk.Button(root, text="🎙 Start Listening", command=on_start_li
 listen_button.pack(pady=5)
 playback_button = tk.Button(root, text="▶ Playback", command=on_start_playback, font=("Arial", 12))
 playback_button.pack(pady=5)
+always_on_button = tk.Button(root, text="👂 Always On: Off", command=on_toggle_always_on, font=("Arial", 12))
+always_on_button.pack(pady=5)
 tk.Button(root, text="⚙ Settings", command=open_settings, font=("Arial", 12)).pack(pady=5)
 
+models.load_async()
+if TTS_PREWARM:
+    threading.Thread(target=assistant.prewarm_tts, args=([NO_AUDIO_RESPONSE],), daemon=True).start()
+
 root.protocol("WM_DELETE_WINDOW", on_closing)
+ui_bus.start()
 root.mainloop()
@@ -1,11 +1,20 @@
 # Language Processing
-import re
+from command_matcher import CommandRegistry
+import os
 import time
 import webbrowser
 
+WEBSITES = ("youtube", "github", "google")
+COMMANDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "commands.json")
+
+registry = CommandRegistry()
+
+def opening_message(site):
+    return f"Opening {site.capitalize()}"
+
 def open_website(site):
     webbrowser.open(f"https://{site}.com")
-    return f"Opening {site.capitalize()}"
+    return opening_message(site)
 
 def search_google(query):
     webbrowser.open(f"https://www.google.com/search?q={query}")
@@ -14,16 +23,75 @@ def search_google(query):
 def tell_time():
     return f"The time is {time.strftime('%I:%M %p')}"
 
-COMMAND_PATTERNS = [
-    (re.compile(r"\bopen (youtube|github|google)\b"), lambda m: open_website(m.group(1))),
-    (re.compile(r"\bsearch for (.+)"), lambda m: search_google(m.group(1))),
-    (re.compile(r"\b(what time is it|tell me the time|the time please|time\??|current time|give me the time|show me the time)\b"), lambda m: tell_time()),
-]
+@registry.command(rf"\bopen ({'|'.join(WEBSITES)})\b",
+                  keywords=WEBSITES,
+                  early=True,
+                  responses=[opening_message(site) for site in WEBSITES])
+def open_website_command(m):
+    return open_website(m.group(1))
+
+@registry.command(r"\bsearch for (.+)", keywords=["search"])
+def search_google_command(m):
+    return search_google(m.group(1))
+
+# Only a partial that is nothing but the question is safe to answer early;
+# anything longer may still turn into something else
+@registry.command(r"^\W*(what time is it|tell me the time)\W*$",
+                  keywords=["time"],
+                  early=True)
+@registry.command(r"\b(what time is it|tell me the time|the time please|current time|give me the time|show me the time)\b",
+                  keywords=["time"])
+def tell_time_command(m):
+    return tell_time()
+
+# Extra commands can be declared without code in commands.json
+if os.path.exists(COMMANDS_FILE):
+    registry.load_config(COMMANDS_FILE)
+
+# Paraphrases for the embedding intent router (intent_router.py), keyed by
+# the command text each one stands for
+INTENT_EXAMPLES = {
+    "what time is it": ["do you know the time", "how late is it", "what's the hour",
+                        "check the clock", "have you got the time"],
+    "open youtube": ["launch youtube", "take me to youtube", "i want to watch some videos",
+                     "bring up youtube", "go to youtube"],
+    "open github": ["launch github", "take me to github", "show me my repositories",
+                    "bring up github", "go to github"],
+    "open google": ["launch google", "take me to google", "bring up the search engine",
+                    "go to google"],
+}
+
+# Fixed replies, worth synthesizing ahead of time
+STATIC_RESPONSES = [response for command in registry.commands for response in command.responses]
+
+def match_command(text, fuzzy=True):
+    # Finds the command without running it. Pass fuzzy=False when called per
+    # frame (the endpointer's is_complete) or on unfinished text.
+    matched = registry.match(text, fuzzy=fuzzy)
+    if matched:
+        command, match = matched
+        return command.handler, match
+    return None
+
+def match_partial(text):
+    # Commands safe to run before the user has finished talking
+    matched = registry.match_early(text)
+    if matched:
+        command, match = matched
+        return command.handler, match
+    return None
 
 def process_command(text):
-    text_lc = text.lower()
-    for pattern, handler in COMMAND_PATTERNS:
-        match = pattern.search(text_lc)
-        if match:
-            return handler(match)
-    return None
\ No newline at end of file
+    matched = match_command(text)
+    if matched:
+        handler, match = matched
+        return handler(match)
+    return None
+
+def route_intent(router, text):
+    # Paraphrases the registry missed: run the command of the nearest intent
+    intent, score = router.route(text)
+    if intent is None:
+        return None
+    print(f"🧭 Intent '{intent}' ({score:.2f})")
+    return process_command(intent)
@@ -0,0 +1,63 @@
+# Lazy model loading with optional background warm-up
+import threading
+
+class ModelRegistry:
+    # Models are registered as loader functions and built on first use, or
+    # ahead of time on a background thread by load_async(). on_status(name,
+    # state) is called with "loading", "ready" or "failed: <error>".
+    def __init__(self, on_status=None):
+        self.on_status = on_status
+        self._specs = {}
+        self._models = {}
+        self._errors = {}
+        self._locks = {}
+
+    def register(self, name, loader, warm_up=None):
+        # Re-registering a name replaces the model on its next use
+        self._specs[name] = (loader, warm_up)
+        self._locks.setdefault(name, threading.Lock())
+        self._models.pop(name, None)
+
+    def _report(self, name, state):
+        if self.on_status:
+            self.on_status(name, state)
+
+    def get(self, name):
+        # Blocks until the model is loaded (loading it here if nobody has yet)
+        if name in self._models:
+            return self._models[name]
+        with self._locks[name]:
+            if name not in self._models:
+                loader, warm_up = self._specs[name]
+                self._report(name, "loading")
+                try:
+                    model = loader()
+                    if warm_up:
+                        warm_up(model)
+                except Exception as e:
+                    self._errors[name] = e
+                    self._report(name, f"failed: {e}")
+                    raise
+                self._errors.pop(name, None)
+                self._models[name] = model
+                self._report(name, "ready")
+        return self._models[name]
+
+    def is_ready(self, name):
+        return name in self._models
+
+    def all_ready(self):
+        return all(name in self._models for name in self._specs)
+
+    def load_async(self, names=None, on_done=None):
+        def run():
+            for name in names or list(self._specs):
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"❌ Failed to load {name}: {e}")
+            if on_done:
+                on_done()
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,282 @@
+# Streaming Ollama client: NDJSON tokens -> sentences -> TTS
+import collections
+import difflib
+import json
+import queue
+import re
+import threading
+import time
+import requests
+
+# End of sentence: terminal punctuation (plus closing quotes/brackets) followed
+# by whitespace, or a line break.
+SENTENCE_BOUNDARY = re.compile(r"[.!?]+[\"')\]]*\s+|\n+")
+MIN_SENTENCE_CHARS = 12
+
+def generate(client, url, model, prompt, timeout=None, extra=None, on_done=None):
+    # extra: further request fields (context, keep_alive, ...); on_done gets
+    # the final response body
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": False,
+        **(extra or {})
+    }
+    res = client.post(url, json=payload, timeout=timeout)
+    res.raise_for_status()
+    body = res.json()
+    if on_done:
+        on_done(body)
+    return body["response"]
+
+def stream_tokens(client, url, model, prompt, timeout=None, cancel_event=None, extra=None, on_done=None,
+                  on_response=None):
+    # Closing the response early (cancel_event set) makes Ollama stop
+    # generating; on_done only sees the final chunk of a complete reply.
+    # on_response gets the open response, e.g. to close it from another
+    # thread while nothing has arrived yet.
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": True,
+        **(extra or {})
+    }
+    with client.stream("POST", url, json=payload, timeout=timeout) as res:
+        if on_response:
+            on_response(res)
+        res.raise_for_status()
+        for line in res.iter_lines(chunk_size=None):
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            if not line:
+                continue
+            chunk = json.loads(line)
+            if "error" in chunk:
+                raise requests.RequestException(chunk["error"])
+            yield chunk.get("response", "")
+            if chunk.get("done"):
+                if on_done:
+                    on_done(chunk)
+                break
+
+def normalize_prompt(prompt):
+    return " ".join(re.sub(r"[^\w\s']", " ", prompt.lower()).split())
+
+class ResponseCache:
+    # LRU of replies with a time-to-live, so repeated questions skip the LLM
+    def __init__(self, max_entries=128, ttl_seconds=600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[0] <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+class OllamaSession:
+    # One conversation with Ollama. The `context` tokens returned with each
+    # reply are sent with the next prompt, so a follow-up only evaluates the
+    # new prompt instead of the whole history, and keep_alive keeps the model
+    # loaded between turns. A conversation idle for idle_reset_seconds starts
+    # over. Replies are cached per (model, normalized prompt, history), and a
+    # hit also restores the history that reply left behind.
+    def __init__(self, client, url, model, keep_alive="10m", idle_reset_seconds=120, cache=None):
+        self.client = client
+        self.url = url
+        self.model = model
+        self.keep_alive = keep_alive
+        self.idle_reset_seconds = idle_reset_seconds
+        self.cache = cache
+        self.reset()
+
+    def reset(self):
+        self.context = None
+        self.last_used = 0.0
+
+    def set_model(self, model):
+        # Context tokens only mean something to the model that produced them
+        if model != self.model:
+            self.model = model
+            self.reset()
+
+    def _prepare(self, prompt):
+        if self.context and time.monotonic() - self.last_used > self.idle_reset_seconds:
+            self.reset()
+        key = (self.model, normalize_prompt(prompt), hash(tuple(self.context)) if self.context else None)
+        cached = self.cache.get(key) if self.cache else None
+        extra = {"keep_alive": self.keep_alive}
+        if self.context:
+            extra["context"] = self.context
+        return key, cached, extra
+
+    def _finish(self, key, reply, body):
+        self.context = body.get("context") or self.context
+        self.last_used = time.monotonic()
+        if self.cache and reply.strip():
+            self.cache.put(key, (reply, self.context))
+
+    def preload(self, timeout=None):
+        # A request without a prompt just loads the model (and resets its
+        # keep_alive timer)
+        res = self.client.post(self.url, json={"model": self.model, "keep_alive": self.keep_alive},
+                               timeout=timeout)
+        res.raise_for_status()
+
+    def generate(self, prompt, timeout=None):
+        key, cached, extra = self._prepare(prompt)
+        if cached:
+            self._finish(key, cached[0], {"context": cached[1]})
+            return cached[0]
+        return generate(self.client, self.url, self.model, prompt, timeout, extra,
+                        on_done=lambda body: self._finish(key, body["response"], body))
+
+    def stream(self, prompt, timeout=None, cancel_event=None):
+        # Yields tokens like stream_tokens; a cached reply comes as one token
+        key, cached, extra = self._prepare(prompt)
+        if cached:
+            self._finish(key, cached[0], {"context": cached[1]})
+            yield cached[0]
+            return
+        parts = []
+        for token in stream_tokens(self.client, self.url, self.model, prompt, timeout, cancel_event, extra,
+                                   on_done=lambda body: self._finish(key, "".join(parts), body)):
+            parts.append(token)
+            yield token
+
+def split_sentences(tokens, min_chars=MIN_SENTENCE_CHARS):
+    buffer = ""
+    for token in tokens:
+        buffer += token
+        start = 0
+        for match in SENTENCE_BOUNDARY.finditer(buffer):
+            if match.end() - start < min_chars:
+                continue
+            sentence = buffer[start:match.end()].strip()
+            if sentence:
+                yield sentence
+            start = match.end()
+        buffer = buffer[start:]
+    if buffer.strip():
+        yield buffer.strip()
+
+def stream_to_speech(sentences, speak, cancel_event=None):
+    # Speaks each sentence on a worker thread while the rest is still being
+    # generated; returns the reply once everything has been spoken, or what
+    # was generated so far if cancel_event is set.
+    pending = queue.Queue()
+    spoken = []
+
+    def worker():
+        while True:
+            sentence = pending.get()
+            if sentence is None:
+                break
+            if cancel_event is None or not cancel_event.is_set():
+                speak(sentence)
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    try:
+        for sentence in sentences:
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            spoken.append(sentence)
+            pending.put(sentence)
+    finally:
+        pending.put(None)
+        thread.join()
+    return " ".join(spoken)
+
+class Speculation:
+    # A reply generated in the background for a prompt that may still change
+    # (e.g. the latest partial transcript once the user pauses). Tokens are
+    # buffered until tokens() is called; the session only takes the turn
+    # into its history once the reply has been consumed in full, so a
+    # cancelled speculation leaves the conversation untouched. cancel()
+    # closes the request, so the LLM client's slot is free for the next one
+    # straight away.
+    def __init__(self, session, prompt, timeout=None):
+        self.session = session
+        self.prompt = prompt
+        self.cancel_event = threading.Event()
+        self._key, self._cached, self._extra = session._prepare(prompt)
+        self._tokens = queue.Queue()
+        self._parts = []
+        self._body = None
+        self._response = None
+        self._thread = threading.Thread(target=self._run, args=(timeout,), daemon=True)
+        self._thread.start()
+
+    def _run(self, timeout):
+        try:
+            if self._cached:
+                self._body = {"context": self._cached[1]}
+                self._tokens.put(self._cached[0])
+            else:
+                for token in stream_tokens(self.session.client, self.session.url, self.session.model,
+                                           self.prompt, timeout, self.cancel_event, self._extra,
+                                           on_done=lambda body: setattr(self, "_body", body),
+                                           on_response=self._opened):
+                    self._tokens.put(token)
+        except Exception as e:
+            self._tokens.put(e)
+        self._tokens.put(None)
+
+    def _opened(self, response):
+        self._response = response
+        if self.cancel_event.is_set():
+            response.close()
+
+    def matches(self, prompt, min_similarity=1.0):
+        # Whether this reply answers prompt: the same model and the same
+        # normalized words, or with min_similarity < 1 a word-level difflib
+        # ratio at least that high (ASR often settles a word differently at
+        # the end)
+        if self._key[0] != self.session.model:
+            return False
+        mine, theirs = self._key[1].split(), normalize_prompt(prompt).split()
+        if mine == theirs:
+            return True
+        return min_similarity < 1.0 and difflib.SequenceMatcher(None, mine, theirs).ratio() >= min_similarity
+
+    def cancel(self):
+        self.cancel_event.set()
+        response = self._response
+        if response is not None:
+            try:
+                response.close()
+            except Exception:
+                pass
+
+    def tokens(self, cancel_event=None):
+        while True:
+            item = self._tokens.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            if cancel_event is not None and cancel_event.is_set():
+                self.cancel()
+                return
+            self._parts.append(item)
+            yield item
+        if self._body is not None:
+            self.session._finish(self._key, "".join(self._parts), self._body)
@@ -0,0 +1,110 @@
+# Long-lived audio output: one stream fed from a queue of PCM buffers
+import queue
+import threading
+import numpy as np
+import pyaudio
+
+def to_mono_int16(pcm, rate, channels, sampwidth, target_rate):
+    # Converts raw PCM (or an int16 array) to mono int16 at target_rate
+    if isinstance(pcm, np.ndarray):
+        samples = pcm.astype(np.int16, copy=False)
+    elif sampwidth == 2:
+        samples = np.frombuffer(pcm, dtype=np.int16)
+    elif sampwidth == 1:
+        samples = ((np.frombuffer(pcm, dtype=np.uint8).astype(np.int16) - 128) << 8)
+    elif sampwidth == 4:
+        samples = (np.frombuffer(pcm, dtype=np.int32) >> 16).astype(np.int16)
+    else:
+        raise ValueError(f"Unsupported sample width: {sampwidth}")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    if rate != target_rate and len(samples):
+        duration = len(samples) / rate
+        positions = np.arange(int(duration * target_rate)) * (rate / target_rate)
+        samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+    return samples
+
+class PlaybackEngine:
+    # Keeps a single output stream open and plays queued buffers in small
+    # blocks, so cancel() takes effect within one block.
+    def __init__(self, audio, rate=16000, block_frames=1024):
+        self.audio = audio
+        self.rate = rate
+        self.block_frames = block_frames
+        self._queue = queue.Queue()
+        self._generation = 0
+        self._stream = None
+        self._thread = None
+        self.output_rms = 0.0  # level of the block being played, for echo suppression
+
+    def start(self):
+        self._stream = self.audio.open(format=pyaudio.paInt16,
+                                       channels=1,
+                                       rate=self.rate,
+                                       output=True,
+                                       frames_per_buffer=self.block_frames)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    @property
+    def generation(self):
+        # Changes on every cancel(); take it before slow work such as TTS
+        return self._generation
+
+    def play(self, pcm, rate=None, channels=1, sampwidth=2, generation=None):
+        # With generation (see above), a buffer that was cancelled while it
+        # was being prepared is dropped; returns whether it was queued
+        if generation is None:
+            generation = self._generation
+        elif generation != self._generation:
+            return False
+        samples = to_mono_int16(pcm, rate or self.rate, channels, sampwidth, self.rate)
+        self._queue.put((generation, samples))
+        return True
+
+    def wait(self):
+        self._queue.join()
+
+    def cancel(self):
+        # Drops queued buffers and stops the one being played
+        self._generation += 1
+        while True:
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+            except queue.Empty:
+                return
+
+    @property
+    def is_playing(self):
+        return self._queue.unfinished_tasks > 0
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    break
+                generation, samples = item
+                for start in range(0, len(samples), self.block_frames):
+                    if generation != self._generation:
+                        break
+                    block = samples[start:start + self.block_frames]
+                    self.output_rms = float(np.sqrt(np.mean((block / 32768.0) ** 2)))
+                    self._stream.write(block.tobytes())
+            except Exception as e:
+                print(f"⚠️ Playback engine error: {e}")
+            finally:
+                self.output_rms = 0.0
+                self._queue.task_done()
+
+    def stop(self):
+        self.cancel()
+        self._queue.put(None)
+        if self._thread:
+            self._thread.join()
+        if self._stream:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
@@ -0,0 +1,275 @@
+# Offline replay benchmark: WAV fixtures through capture -> VAD -> endpoint -> ASR -> command
+#
+#   python replay_benchmark.py fixtures/*.wav [--asr whisper] [--realtime] [--output results.json]
+#
+# Each fixture (16 kHz mono) is played into AudioCapture through a fake PyAudio
+# stream, followed by silence so the endpointer can fire, and runs through the
+# same VoicePipeline as medium_assist's listen(). A fixture.txt next to a WAV
+# holds its expected transcript. Models must already be cached locally; nothing
+# is downloaded.
+import argparse
+import json
+import os
+import queue
+import resource
+import sys
+import threading
+import time
+import numpy as np
+import soundfile as sf
+
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+from asr_backends import ASR_BACKENDS, create_backend
+from audio_buffer import AudioRingBuffer
+from audio_pipeline import AudioCapture
+from endpointing import Endpointer
+from medium_assist_commands import match_command, registry
+from ollama_client import normalize_prompt
+from voice_pipeline import VoicePipeline
+
+SAMPLE_RATE = 16000
+NUM_SAMPLES = 512
+CONFIDENCE_THRESHOLD = 0.5
+VAD_BATCH_FRAMES = 1
+TRAILING_SILENCE_SECONDS = 4.0
+
+class ReplayStream:
+    # Stands in for a PyAudio callback stream: delivers the fixture in
+    # frames_per_buffer chunks from its own thread, paced like a microphone
+    # or as fast as possible
+    def __init__(self, pcm, frames_per_buffer, rate, callback, realtime):
+        self.pcm = pcm
+        self.frames_per_buffer = frames_per_buffer
+        self.rate = rate
+        self.callback = callback
+        self.realtime = realtime
+        self.audio_end_time = None  # when the last fixture sample was delivered
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        start = time.perf_counter()
+        period = self.frames_per_buffer / self.rate
+        speech_frames = -(-len(self.pcm) // self.frames_per_buffer)
+        silence_frames = int(TRAILING_SILENCE_SECONDS / period)
+        for index in range(speech_frames + silence_frames):
+            if self._stopped.is_set():
+                return
+            if self.realtime:
+                delay = start + (index + 1) * period - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            chunk = self.pcm[index * self.frames_per_buffer:(index + 1) * self.frames_per_buffer]
+            if len(chunk) < self.frames_per_buffer:
+                chunk = np.pad(chunk, (0, self.frames_per_buffer - len(chunk)))
+            self.callback(chunk.tobytes(), self.frames_per_buffer, None, 0)
+            if index == speech_frames - 1:
+                self.audio_end_time = time.perf_counter()
+
+    def start_stream(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop_stream(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+
+    def close(self):
+        pass
+
+class TimedBackend:
+    # Adds up the time spent in every decode, including the streaming
+    # transcriber's passes on its worker thread, so the real-time factor
+    # covers all ASR work and not only the final tail
+    def __init__(self, backend):
+        self.backend = backend
+        self.name = backend.name
+        self.sample_rate = backend.sample_rate
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _timed(self, decode, *args):
+        start = time.perf_counter()
+        try:
+            return decode(*args)
+        finally:
+            with self._lock:
+                self.seconds += time.perf_counter() - start
+
+    def transcribe(self, audio_float32, prompt=None):
+        return self._timed(self.backend.transcribe, audio_float32, prompt)
+
+    def segments(self, audio_float32, prompt=None):
+        return self._timed(self.backend.segments, audio_float32, prompt)
+
+    def stream(self):
+        return self.backend.stream()
+
+class ReplayAudio:
+    # The part of pyaudio.PyAudio that AudioCapture uses
+    def __init__(self, pcm, realtime=False):
+        self.pcm = pcm
+        self.realtime = realtime
+        self.stream = None
+
+    def open(self, format, channels, rate, input, frames_per_buffer, stream_callback):
+        self.stream = ReplayStream(self.pcm, frames_per_buffer, rate, stream_callback, self.realtime)
+        return self.stream
+
+def load_fixture(path):
+    pcm, rate = sf.read(path, dtype="int16")
+    if rate != SAMPLE_RATE or pcm.ndim != 1:
+        raise ValueError(f"{path}: expected 16 kHz mono, got {rate} Hz with shape {pcm.shape}")
+    expected = None
+    text_path = os.path.splitext(path)[0] + ".txt"
+    if os.path.exists(text_path):
+        with open(text_path, encoding="utf-8") as f:
+            expected = f.read().strip()
+    return pcm, expected
+
+def load_vad():
+    import torch
+    torch.set_num_threads(1)
+    from silero_vad import load_silero_vad
+    from vad_engine import VadEngine
+    return VadEngine(load_silero_vad(), SAMPLE_RATE, NUM_SAMPLES, VAD_BATCH_FRAMES)
+
+def percentiles(values):
+    if not values:
+        return None
+    values = np.asarray(values, dtype=np.float64)
+    return {
+        "count": len(values),
+        "p50": float(np.percentile(values, 50)),
+        "p90": float(np.percentile(values, 90)),
+        "p99": float(np.percentile(values, 99)),
+        "max": float(values.max()),
+    }
+
+def run_fixture(path, vad, asr, realtime=False, streaming=True):
+    pcm, expected = load_fixture(path)
+    asr = TimedBackend(asr)
+    partial = [""]
+    endpointer = Endpointer(NUM_SAMPLES / SAMPLE_RATE, threshold=CONFIDENCE_THRESHOLD,
+                            is_complete=lambda: match_command(partial[0], fuzzy=False) is not None)
+    buffer = AudioRingBuffer(len(pcm) / SAMPLE_RATE + TRAILING_SILENCE_SECONDS + 1, SAMPLE_RATE)
+    pipeline = VoicePipeline(vad, asr, endpointer, buffer, frame_samples=NUM_SAMPLES,
+                             threshold=CONFIDENCE_THRESHOLD, streaming=streaming,
+                             on_partial=lambda text: partial.__setitem__(0, text))
+    replay = ReplayAudio(pcm, realtime)
+    # Unbounded queue in max-speed mode: the benchmark measures processing, not frame drops
+    max_queued = 64 if realtime else len(pcm) // NUM_SAMPLES + int(TRAILING_SILENCE_SECONDS * SAMPLE_RATE / NUM_SAMPLES) + 2
+    capture = AudioCapture(replay, rate=SAMPLE_RATE, frames_per_buffer=NUM_SAMPLES,
+                           max_queued_frames=max_queued)
+
+    start = time.perf_counter()
+    with capture:
+        try:
+            reason = pipeline.listen(capture)
+        except queue.Empty:
+            reason = "fixture ended before the endpoint"
+        endpoint_time = time.perf_counter()
+        speech = pipeline.speech()
+        text = pipeline.transcribe(speech) if speech else ""
+        if not speech:
+            pipeline.cancel()
+        transcribed_time = time.perf_counter()
+        matched = registry.match(text) if text else None
+        done_time = time.perf_counter()
+    audio_seconds = len(pcm) / SAMPLE_RATE
+    # In max-speed mode the whole fixture is queued at once, so wall-clock
+    # time since the last sample only measures the backlog. The endpoint
+    # delay is measured in audio time instead: the silence the endpointer
+    # waited out, as in medium_assist's trace.
+    endpoint_ms = endpointer.silent_frames * NUM_SAMPLES / SAMPLE_RATE * 1000
+    transcribe_ms = (transcribed_time - endpoint_time) * 1000
+    command_ms = (done_time - transcribed_time) * 1000
+    result = {
+        "fixture": os.path.basename(path),
+        "audio_seconds": audio_seconds,
+        "reason": reason,
+        "text": text,
+        "command": matched[0].name if matched else None,
+        "endpoint_ms": endpoint_ms,
+        "transcribe_ms": transcribe_ms,
+        "command_ms": command_ms,
+        "response_ms": endpoint_ms + transcribe_ms + command_ms,
+        "wall_ms": (done_time - start) * 1000,
+        "vad_ms": pipeline.timings["vad_ms"],
+        "asr_ms": asr.seconds * 1000,
+        "rtf": (sum(pipeline.timings["vad_ms"]) + asr.seconds * 1000) / 1000 / audio_seconds,
+        "capture": capture.stats(),
+    }
+    if realtime and replay.stream.audio_end_time:
+        # Paced like a microphone, wall-clock time since the last sample is
+        # what a user would wait
+        result["response_wall_ms"] = (done_time - replay.stream.audio_end_time) * 1000
+    if expected is not None:
+        result["expected"] = expected
+        result["correct"] = normalize_prompt(text) == normalize_prompt(expected)
+    return result
+
+def run(paths, asr_name="whisper", asr_options=None, realtime=False, streaming=True, repeat=1):
+    usage_start = resource.getrusage(resource.RUSAGE_SELF)
+    wall_start = time.perf_counter()
+    vad = load_vad()
+    asr = create_backend(asr_name, **(asr_options or {}))
+    asr.warm_up()
+    load_seconds = time.perf_counter() - wall_start
+
+    results = []
+    for _ in range(repeat):
+        for path in paths:
+            results.append(run_fixture(path, vad, asr, realtime, streaming))
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    wall = time.perf_counter() - wall_start
+    cpu = (usage.ru_utime - usage_start.ru_utime) + (usage.ru_stime - usage_start.ru_stime)
+    stages = {name: percentiles([value for r in results if name in r for value in
+                                 (r[name] if isinstance(r[name], list) else [r[name]])])
+              for name in ("vad_ms", "endpoint_ms", "transcribe_ms", "command_ms", "response_ms",
+                           "response_wall_ms")}
+    checked = [r["correct"] for r in results if "correct" in r]
+    for r in results:
+        del r["vad_ms"]
+    return {
+        "asr": asr_name,
+        "asr_options": asr_options or {},
+        "mode": "realtime" if realtime else "max-speed",
+        "streaming": streaming,
+        "model_load_seconds": load_seconds,
+        "stages": stages,
+        "rtf": percentiles([r["rtf"] for r in results]),
+        "accuracy": sum(checked) / len(checked) if checked else None,
+        "cpu_seconds": cpu,
+        "cpu_utilization": cpu / wall if wall else 0.0,
+        "peak_rss_mb": usage.ru_maxrss / 1024,
+        "fixtures": results,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay WAV fixtures through the voice pipeline")
+    parser.add_argument("fixtures", nargs="+", help="16 kHz mono WAV files")
+    parser.add_argument("--asr", default="whisper", choices=sorted(ASR_BACKENDS))
+    parser.add_argument("--model", help="model name (whisper, faster-whisper) or path (vosk)")
+    parser.add_argument("--realtime", action="store_true", help="pace audio like a live microphone")
+    parser.add_argument("--no-streaming", action="store_true", help="transcribe only after the endpoint")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    options = {}
+    if args.model:
+        options["model_path" if args.asr == "vosk" else "model_name"] = args.model
+    report = run(args.fixtures, args.asr, options, args.realtime, not args.no_streaming, args.repeat)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    sys.exit(main())
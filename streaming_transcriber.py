@@ -0,0 +1,119 @@
+# Incremental transcription while the user is still talking
+import threading
+
+class StreamingTranscriber:
+    # transcribe_fn(audio_np, prompt) -> [(start_seconds, end_seconds, text), ...]
+    # tail_fn(audio_np, prompt) -> text, optional faster decode for the final tail
+    # on_partial(text) gets committed plus tentative text after every pass,
+    # on_stable(text) only the committed text, whenever it grows
+    # Audio is read from a shared AudioRingBuffer; offsets are absolute sample indices.
+    def __init__(self, transcribe_fn, buffer, step_seconds=1.0,
+                 window_seconds=15.0, on_partial=None, tail_fn=None, on_stable=None):
+        self.transcribe_fn = transcribe_fn
+        self.tail_fn = tail_fn
+        self.buffer = buffer
+        self.sample_rate = buffer.sample_rate
+        self.step_samples = int(step_seconds * self.sample_rate)
+        self.window_samples = int(window_seconds * self.sample_rate)
+        self.on_partial = on_partial
+        self.on_stable = on_stable
+        self._offset = buffer.total_written  # first sample not covered by committed text
+        self._decoded_upto = self._offset  # sample count at the last decode pass
+        self._committed = []
+        self._previous = []         # uncommitted segment texts from the last pass
+        self._lock = threading.Lock()
+        self._new_audio = threading.Event()
+        self._stopped = threading.Event()
+        self._worker = None
+
+    def start(self):
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def start_at(self, index):
+        # Skip audio before index (e.g. leading silence) if nothing is committed yet
+        with self._lock:
+            if not self._committed:
+                self._offset = max(self._offset, index)
+                self._decoded_upto = max(self._decoded_upto, index)
+
+    def feed(self):
+        # Called by the capture thread after each buffer write
+        with self._lock:
+            if self.buffer.total_written - self._decoded_upto >= self.step_samples:
+                self._new_audio.set()
+
+    def _window(self, copy=True, end=None):
+        # The worker copies its window since capture keeps writing to the ring
+        with self._lock:
+            window = self.buffer.float32_since(self._offset)
+            base = max(self._offset, self.buffer.start)
+            if end is not None:
+                window = window[:max(0, end - base)]
+            return (window.copy() if copy else window), base, self.buffer.total_written
+
+    def _prompt(self):
+        return " ".join(self._committed) or None
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._new_audio.wait(timeout=0.1)
+            if self._stopped.is_set():
+                break
+            if not self._new_audio.is_set():
+                continue
+            self._new_audio.clear()
+            window, base, total = self._window()
+            self._decoded_upto = total
+            try:
+                segments = self.transcribe_fn(window, self._prompt())
+            except Exception as e:
+                print(f"⚠️ Streaming transcription error: {e}")
+                continue
+            if self._stopped.is_set():
+                break
+            self._commit(segments, base, force=len(window) >= self.window_samples)
+
+    def _commit(self, segments, base, force=False):
+        # A segment is stable once two consecutive passes agree on it and it is
+        # not the last (still growing) one.
+        texts = [text.strip() for _, _, text in segments]
+        stable = 0
+        while (stable < len(segments) - 1
+               and stable < len(self._previous)
+               and texts[stable] == self._previous[stable]):
+            stable += 1
+        if force:
+            stable = max(stable, len(segments) - 1)
+
+        for _, end, text in segments[:stable]:
+            if text.strip():
+                self._committed.append(text.strip())
+            with self._lock:
+                self._offset = min(self.buffer.total_written, base + int(end * self.sample_rate))
+        self._previous = texts[stable:]
+
+        if self.on_stable and stable:
+            self.on_stable(" ".join(self._committed))
+        if self.on_partial:
+            self.on_partial(" ".join(self._committed + self._previous).strip())
+
+    def cancel(self):
+        self._stopped.set()
+        self._new_audio.set()
+        if self._worker:
+            self._worker.join()
+
+    def finish(self, end=None):
+        # Stop the worker and decode only the uncommitted tail, up to absolute
+        # sample index end (e.g. to drop trailing silence)
+        self.cancel()
+        window, _, _ = self._window(copy=False, end=end)
+        if len(window) and self.tail_fn:
+            tail = self.tail_fn(window, self._prompt())
+            if tail:
+                self._committed.append(tail.strip())
+        elif len(window):
+            tail = self.transcribe_fn(window, self._prompt())
+            self._committed.extend(text.strip() for _, _, text in tail if text.strip())
+        return " ".join(self._committed).strip()
@@ -0,0 +1,8 @@
+# Unit tests for the pure modules; run with `python -m pytest` from the repo root
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Manual scripts that need a microphone and downloaded models
+collect_ignore = ["pyaudio_test.py", "silero_test.py"]
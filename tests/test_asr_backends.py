@@ -0,0 +1,32 @@
+import threading
+import time
+from asr_backends import ASRBackend, SerializedBackend
+
+class SlowBackend(ASRBackend):
+    name = "slow"
+
+    def __init__(self):
+        self.active = 0
+        self.overlaps = 0
+
+    def segments(self, audio, prompt=None):
+        self.active += 1
+        if self.active > 1:
+            self.overlaps += 1
+        time.sleep(0.01)
+        self.active -= 1
+        return [(0.0, 1.0, f" {audio}")]
+
+def test_serialized_backend_runs_one_decode_at_a_time():
+    slow = SlowBackend()
+    backend = SerializedBackend(slow)
+    threads = [threading.Thread(target=backend.segments, args=(i,)) for i in range(4)] + \
+              [threading.Thread(target=backend.transcribe, args=(i,)) for i in range(4)] + \
+              [threading.Thread(target=backend.transcribe_batch, args=([1, 2],))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert slow.overlaps == 0
+    assert backend.transcribe("a") == "a"
+    assert backend.name == "slow"
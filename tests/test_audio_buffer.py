@@ -0,0 +1,37 @@
+import numpy as np
+from audio_buffer import AudioRingBuffer
+
+def test_write_and_read_back():
+    buffer = AudioRingBuffer(max_seconds=1, sample_rate=10)
+    written = buffer.write(np.array([1, 2, 3], dtype=np.int16).tobytes())
+    assert len(buffer) == 3
+    assert buffer.int16().tolist() == [1, 2, 3]
+    assert np.allclose(written, np.array([1, 2, 3]) / 32768)
+
+def test_wraps_around_keeping_the_newest_samples_contiguous():
+    buffer = AudioRingBuffer(max_seconds=1, sample_rate=10)
+    buffer.write(np.arange(8, dtype=np.int16))
+    buffer.write(np.arange(8, 14, dtype=np.int16))
+    assert len(buffer) == 10
+    assert buffer.int16().tolist() == list(range(4, 14))
+    assert buffer.int16(3).tolist() == [11, 12, 13]
+    assert buffer.start == 4
+    assert buffer.total_written == 14
+
+def test_oversized_write_keeps_the_tail():
+    buffer = AudioRingBuffer(max_seconds=1, sample_rate=4)
+    buffer.write(np.arange(10, dtype=np.int16))
+    assert buffer.int16().tolist() == [6, 7, 8, 9]
+
+def test_float32_since_clamps_to_oldest_sample():
+    buffer = AudioRingBuffer(max_seconds=1, sample_rate=5)
+    buffer.write(np.arange(1, 8, dtype=np.int16))
+    assert np.allclose(buffer.float32_since(5) * 32768, [6, 7])
+    assert np.allclose(buffer.float32_since(0) * 32768, [3, 4, 5, 6, 7])
+
+def test_clear():
+    buffer = AudioRingBuffer(max_seconds=1, sample_rate=10)
+    buffer.write(np.arange(5, dtype=np.int16))
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.tobytes() == b""
@@ -0,0 +1,60 @@
+import http.server
+import threading
+import time
+import pytest
+import requests
+from backend_client import BackendClient
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    # POST /slow sleeps past the client's read timeout; POST /busy answers
+    # 503 until the third attempt
+    hits = {}
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.hits[self.path] = self.hits.get(self.path, 0) + 1
+        if self.path == "/slow":
+            time.sleep(0.5)
+            self.reply(200, b"late")
+        elif self.path == "/busy" and self.hits[self.path] < 3:
+            self.reply(503, b"busy")
+        else:
+            self.reply(200, b"ok")
+
+    def reply(self, status, body):
+        try:
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            pass
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    StubHandler.hits = {}
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+def test_slow_post_is_sent_once_and_times_out(server):
+    client = BackendClient(timeout=(1, 0.1), retries=2, backoff=0)
+    with pytest.raises(requests.Timeout):
+        client.post(server + "/slow", json={"prompt": "hi"})
+    time.sleep(0.6)
+    assert StubHandler.hits["/slow"] == 1
+    client.close()
+
+def test_503_is_retried(server):
+    client = BackendClient(retries=2, backoff=0)
+    res = client.post(server + "/busy", json={"prompt": "hi"})
+    assert res.status_code == 200
+    assert res.text == "ok"
+    assert StubHandler.hits["/busy"] == 3
+    client.close()
@@ -0,0 +1,68 @@
+import threading
+import pytest
+from batch_scheduler import TranscriptionScheduler
+
+class FakeBackend:
+    name = "fake"
+    sample_rate = 16000
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def transcribe_batch(self, audios, prompt=None):
+        with self._lock:
+            self.batches.append((list(audios), prompt))
+        if self.fail:
+            raise RuntimeError("decode failed")
+        return [f"{prompt}:{audio}" for audio in audios]
+
+@pytest.fixture
+def backend():
+    return FakeBackend()
+
+def test_single_request(backend):
+    scheduler = TranscriptionScheduler(backend, max_wait_seconds=0.001).start()
+    try:
+        assert scheduler.transcribe("a") == "None:a"
+    finally:
+        scheduler.stop()
+
+def test_concurrent_requests_share_a_batch_per_prompt(backend):
+    scheduler = TranscriptionScheduler(backend, max_batch=4, max_wait_seconds=0.2)
+    futures = [scheduler.submit(i, prompt="p" if i % 2 else None) for i in range(6)]
+    scheduler.start()
+    try:
+        results = [future.result(timeout=5) for future in futures]
+    finally:
+        scheduler.stop()
+    assert results == [f"{'p' if i % 2 else None}:{i}" for i in range(6)]
+    assert sorted((prompt, audios) for audios, prompt in backend.batches
+                  if prompt is None) == [(None, [0, 2, 4])]
+    assert [audios for audios, prompt in backend.batches if prompt == "p"] == [[1, 3, 5]]
+    assert scheduler.mean_batch_size() == 3
+
+def test_batches_are_capped(backend):
+    scheduler = TranscriptionScheduler(backend, max_batch=2, max_wait_seconds=0.2)
+    futures = [scheduler.submit(i) for i in range(5)]
+    scheduler.start()
+    try:
+        [future.result(timeout=5) for future in futures]
+    finally:
+        scheduler.stop()
+    assert [len(audios) for audios, _ in backend.batches] == [2, 2, 1]
+
+def test_errors_reach_every_caller():
+    scheduler = TranscriptionScheduler(FakeBackend(fail=True), max_wait_seconds=0.001).start()
+    try:
+        with pytest.raises(RuntimeError):
+            scheduler.transcribe("a")
+    finally:
+        scheduler.stop()
+
+def test_submit_after_stop_fails(backend):
+    scheduler = TranscriptionScheduler(backend).start()
+    scheduler.stop()
+    with pytest.raises(RuntimeError):
+        scheduler.submit("a")
@@ -0,0 +1,63 @@
+import pytest
+from command_matcher import CommandRegistry, KeywordAutomaton
+from medium_assist_commands import match_command, match_partial
+
+def test_automaton_finds_whole_words_only():
+    automaton = KeywordAutomaton()
+    automaton.add("time", "time")
+    automaton.add("tube", "tube")
+    assert automaton.find("what time is it") == {"time"}
+    assert automaton.find("sometimes youtube") == set()
+    assert automaton.find("time tube") == {"time", "tube"}
+
+def test_registry_only_tries_commands_whose_keyword_is_present():
+    registry = CommandRegistry()
+    registry.command(r"\bopen (youtube)\b", keywords=["youtube"])(lambda m: "yt")
+    registry.command(r"\bhello\b")(lambda m: "hi")
+    assert [c.patterns[0].pattern for c in registry.candidates("open youtube")] == \
+        [r"\bopen (youtube)\b", r"\bhello\b"]
+    assert [c.patterns[0].pattern for c in registry.candidates("nothing here")] == [r"\bhello\b"]
+
+@pytest.mark.parametrize("text, expected", [
+    ("Open YouTube.", "open youtube"),
+    ("open you tube", "open youtube"),
+    ("open goggle", "open google"),
+    ("open git hub", "open github"),
+    ("what time is it", "what time is it"),
+    ("hey, what time is it?", "what time is it"),
+    ("search for cats", "search for cats"),
+])
+def test_matches_commands_and_asr_typos(text, expected):
+    handler, match = match_command(text)
+    assert match.group(0) == expected
+
+@pytest.mark.parametrize("text", [
+    "I need to research for my essay",
+    "tell me about times square",
+    "what times do you open",
+    "I have no time for this",
+    "what's a good time to visit Japan",
+    "open the window",
+    "tell me a joke",
+])
+def test_ordinary_speech_is_not_a_command(text):
+    assert match_command(text) is None
+
+def test_fuzzy_matching_can_be_disabled():
+    assert match_command("open you tube", fuzzy=False) is None
+    assert match_command("open youtube", fuzzy=False) is not None
+
+def test_fuzzy_fix_must_match_the_whole_utterance():
+    assert match_command("so anyway I said open you tube to him") is None
+
+def test_early_match_needs_an_early_command():
+    assert match_partial("open youtube") is not None
+    assert match_partial("search for cats") is None
+
+@pytest.mark.parametrize("text", ["what time is it", " What time is it?", "tell me the time"])
+def test_exact_time_question_runs_early(text):
+    assert match_partial(text) is not None
+
+@pytest.mark.parametrize("text", ["what's a good time", "what time is it in tokyo", "hey give me the time"])
+def test_other_time_phrases_wait_for_the_final_transcript(text):
+    assert match_partial(text) is None
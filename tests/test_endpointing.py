@@ -0,0 +1,63 @@
+from endpointing import Endpointer
+
+FRAME_SECONDS = 0.032
+LOUD = 0.1
+QUIET = 0.001
+
+def feed(endpointer, frames):
+    # Returns the index of the frame that ended the utterance, or None
+    for index, (confidence, rms) in enumerate(frames):
+        if endpointer.update(confidence, rms):
+            return index
+    return None
+
+def test_no_speech_timeout():
+    endpointer = Endpointer(FRAME_SECONDS, no_speech_timeout_seconds=1.0)
+    end = feed(endpointer, [(0.0, QUIET)] * 100)
+    assert end == round(1.0 / FRAME_SECONDS) - 1
+    assert not endpointer.speech_detected
+    assert "no speech" in endpointer.reason
+
+def test_grace_period_after_speech():
+    endpointer = Endpointer(FRAME_SECONDS, grace_seconds=0.5)
+    end = feed(endpointer, [(0.9, LOUD)] * 10 + [(0.0, QUIET)] * 100)
+    assert endpointer.speech_detected
+    assert end == 10 + round(0.5 / FRAME_SECONDS) - 1
+    assert endpointer.silent_frames == round(0.5 / FRAME_SECONDS)
+
+def test_hysteresis_keeps_speech_going():
+    endpointer = Endpointer(FRAME_SECONDS, threshold=0.5, hysteresis=0.15, grace_seconds=0.2)
+    feed(endpointer, [(0.9, LOUD)] * 5)
+    # Below threshold but above threshold - hysteresis: still speech
+    assert feed(endpointer, [(0.4, LOUD)] * 50) is None
+    assert endpointer.in_speech
+
+def test_short_grace_when_complete():
+    complete = [False]
+    endpointer = Endpointer(FRAME_SECONDS, grace_seconds=1.5, short_grace_seconds=0.3,
+                            is_complete=lambda: complete[0])
+    feed(endpointer, [(0.9, LOUD)] * 10)
+    assert feed(endpointer, [(0.0, QUIET)] * round(0.3 / FRAME_SECONDS)) is None
+    complete[0] = True
+    assert feed(endpointer, [(0.0, QUIET)]) == 0
+    assert "complete" in endpointer.reason
+
+def test_quiet_frames_need_margin_above_noise_floor():
+    endpointer = Endpointer(FRAME_SECONDS, noise_margin_db=6.0, no_speech_timeout_seconds=10)
+    feed(endpointer, [(0.0, 0.01)] * 20)
+    # Confident but no louder than the background: not speech
+    feed(endpointer, [(0.9, 0.011)] * 5)
+    assert not endpointer.speech_detected
+    feed(endpointer, [(0.9, 0.05)])
+    assert endpointer.speech_detected
+
+def test_configure_rejects_unknown_settings():
+    endpointer = Endpointer(FRAME_SECONDS)
+    endpointer.configure(grace_seconds=2.0)
+    assert endpointer.grace_seconds == 2.0
+    try:
+        endpointer.configure(grace=2.0)
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("expected AttributeError")
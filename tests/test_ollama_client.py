@@ -0,0 +1,107 @@
+import contextlib
+import json as jsonlib
+import time
+from ollama_client import OllamaSession, ResponseCache, Speculation, split_sentences
+
+def test_splits_streamed_tokens_into_sentences():
+    tokens = ["Hello there", ", friend. How", " are you today? I am", " fine."]
+    assert list(split_sentences(tokens)) == ["Hello there, friend.", "How are you today?", "I am fine."]
+
+def test_short_fragments_join_the_next_sentence():
+    tokens = ["Hi. ", "Yes. ", "OK then. ", "That is a longer sentence. "]
+    assert list(split_sentences(tokens, min_chars=12)) == ["Hi. Yes. OK then.", "That is a longer sentence."]
+
+def test_line_breaks_end_sentences():
+    assert list(split_sentences(["First line here\nSecond line here"])) == \
+        ["First line here", "Second line here"]
+
+def test_closing_quotes_stay_with_the_sentence():
+    assert list(split_sentences(['He said "go home." Then he left.'])) == \
+        ['He said "go home."', "Then he left."]
+
+def test_empty_stream():
+    assert list(split_sentences([])) == []
+    assert list(split_sentences(["   "])) == []
+
+class FakeResponse:
+    def __init__(self, body, lines=()):
+        self.body = body
+        self.lines = lines
+        self.closed = False
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+    def iter_lines(self, chunk_size=None):
+        return iter(self.lines)
+
+    def close(self):
+        self.closed = True
+
+class FakeClient:
+    def __init__(self):
+        self.payloads = []
+
+    def post(self, url, json=None, timeout=None):
+        self.payloads.append(json)
+        return FakeResponse({"response": f"{json['model']} says hi",
+                             "context": [len(self.payloads)]})
+
+    @contextlib.contextmanager
+    def stream(self, method, url, json=None, timeout=None):
+        self.payloads.append(json)
+        words = ["Paris", " is", " the", " capital."]
+        lines = [jsonlib.dumps({"response": w, "done": False}).encode() for w in words]
+        lines.append(jsonlib.dumps({"response": "", "done": True, "context": [len(self.payloads)]}).encode())
+        yield FakeResponse(None, lines)
+
+def test_session_sends_context_back():
+    client = FakeClient()
+    session = OllamaSession(client, "http://ollama", "small")
+    session.generate("hello")
+    session.generate("and then?")
+    assert "context" not in client.payloads[0]
+    assert client.payloads[1]["context"] == [1]
+
+def test_cached_replies_are_reused_per_model():
+    client = FakeClient()
+    session = OllamaSession(client, "http://ollama", "small", cache=ResponseCache())
+    assert session.generate("Hello!") == "small says hi"
+    session.reset()
+    assert session.generate("hello") == "small says hi"
+    assert len(client.payloads) == 1
+
+    session.set_model("large")
+    assert session.context is None
+    assert session.generate("hello") == "large says hi"
+    assert len(client.payloads) == 2
+    assert "context" not in client.payloads[1]
+
+def test_cache_expires():
+    cache = ResponseCache(max_entries=2, ttl_seconds=0)
+    cache.put("a", 1)
+    time.sleep(0.01)
+    assert cache.get("a") is None
+
+def test_speculation_on_the_partial_answers_the_final_transcript():
+    client = FakeClient()
+    session = OllamaSession(client, "http://ollama", "small")
+    speculation = Speculation(session, "what is the capital of france")
+    assert speculation.matches("What is the capital of France?")
+    assert not speculation.matches("What is the capital of Spain?")
+    assert speculation.matches("What is the capital of France then?", min_similarity=0.85)
+    assert "".join(speculation.tokens()) == "Paris is the capital."
+    assert len(client.payloads) == 1
+    assert session.context == [1]
+
+def test_speculation_does_not_match_other_prompts_or_models():
+    session = OllamaSession(FakeClient(), "http://ollama", "small")
+    speculation = Speculation(session, "what is the capital of france")
+    assert not speculation.matches("tell me a joke about cats", min_similarity=0.85)
+    session.set_model("large")
+    assert not speculation.matches("what is the capital of france")
+    speculation.cancel()
+    assert session.context is None
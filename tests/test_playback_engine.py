@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("pyaudio")
+from playback_engine import PlaybackEngine
+
+class FakeStream:
+    def __init__(self):
+        self.written = []
+
+    def write(self, data):
+        self.written.append(data)
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        pass
+
+class FakeAudio:
+    def __init__(self):
+        self.stream = FakeStream()
+
+    def open(self, **kwargs):
+        return self.stream
+
+def test_audio_cancelled_while_it_was_prepared_is_dropped():
+    audio = FakeAudio()
+    player = PlaybackEngine(audio).start()
+    try:
+        generation = player.generation
+        player.cancel()  # e.g. a barge-in during TTS
+        assert not player.play(np.ones(2048, dtype=np.int16), generation=generation)
+        player.wait()
+        assert audio.stream.written == []
+        assert player.play(np.ones(2048, dtype=np.int16), generation=player.generation)
+        player.wait()
+        assert len(audio.stream.written) == 2
+    finally:
+        player.stop()
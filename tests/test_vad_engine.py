@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+from vad_engine import VadEngine
+
+class LoudnessModel:
+    # Stands in for Silero: "confidence" is the frame's peak
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, frame, sample_rate):
+        self.calls += 1
+        return frame.abs().max().reshape(1, 1)
+
+    def reset_states(self):
+        pass
+
+def frame(level, samples=512):
+    return np.full(samples, level, dtype=np.float32)
+
+def test_each_frame_is_scored_on_arrival():
+    vad = VadEngine(LoudnessModel())
+    confidence, rms = vad.push(frame(0.5))[0]
+    assert confidence == pytest.approx(0.5)
+    assert rms == pytest.approx(0.5)
+
+def test_batched_frames_keep_their_own_level():
+    vad = VadEngine(LoudnessModel(), batch_frames=3)
+    assert vad.push(frame(0.1)) == []
+    assert vad.push(frame(0.2)) == []
+    scored = vad.push(frame(0.3))
+    assert [round(c, 3) for c, _ in scored] == [0.1, 0.2, 0.3]
+    assert [round(r, 3) for _, r in scored] == [0.1, 0.2, 0.3]
+
+def test_score_flushes_the_last_partial_batch():
+    vad = VadEngine(LoudnessModel(), batch_frames=4)
+    assert len(list(vad.score([frame(0.1)] * 5))) == 5
@@ -0,0 +1,24 @@
+import numpy as np
+from vad_segments import collect_speech, speech_segments
+
+def test_no_speech():
+    assert speech_segments([0.1] * 20) == []
+
+def test_pads_and_converts_to_samples():
+    confidences = [0.0] * 10 + [0.9] * 5 + [0.0] * 10
+    assert speech_segments(confidences, frame_samples=4, pad_frames=2) == [(8 * 4, 17 * 4)]
+
+def test_drops_clicks():
+    confidences = [0.0] * 10 + [0.9] * 2 + [0.0] * 10
+    assert speech_segments(confidences, min_speech_frames=3) == []
+
+def test_merges_close_runs_and_keeps_distant_ones_apart():
+    confidences = [0.9] * 5 + [0.0] * 4 + [0.9] * 5 + [0.0] * 30 + [0.9] * 5
+    segments = speech_segments(confidences, frame_samples=1, pad_frames=0, merge_gap_frames=5)
+    assert segments == [(0, 14), (44, 49)]
+
+def test_collect_speech():
+    audio = np.arange(20, dtype=np.float32)
+    single = collect_speech(audio, [(2, 5)])
+    assert np.shares_memory(single, audio)
+    assert collect_speech(audio, [(0, 2), (10, 12)]).tolist() == [0, 1, 10, 11]
@@ -0,0 +1,61 @@
+import queue
+import numpy as np
+from audio_buffer import AudioRingBuffer
+from endpointing import Endpointer
+from voice_pipeline import VoicePipeline
+
+FRAME = 512
+RATE = 16000
+
+class LoudnessVad:
+    def reset(self):
+        pass
+
+    def push(self, samples):
+        rms = float(np.sqrt(np.mean(samples**2)))
+        return [(1.0 if rms > 0.01 else 0.0, rms)]
+
+class RecordingAsr:
+    name = "recording"
+    sample_rate = RATE
+
+    def __init__(self):
+        self.decoded = []
+
+    def segments(self, audio, prompt=None):
+        return [(0.0, len(audio) / RATE, "still talking")]
+
+    def transcribe(self, audio, prompt=None):
+        self.decoded.append(np.asarray(audio).copy())
+        return "stop the music"
+
+class FrameCapture:
+    def __init__(self, pcm):
+        self.frames = [pcm[i:i + FRAME].tobytes() for i in range(0, len(pcm), FRAME)]
+
+    def read(self, timeout=None):
+        if not self.frames:
+            raise queue.Empty
+        return self.frames.pop(0)
+
+def tone(samples, level=8000):
+    return np.full(samples, level, dtype=np.int16)
+
+def run_with_preroll(streaming):
+    asr = RecordingAsr()
+    endpointer = Endpointer(FRAME / RATE, grace_seconds=0.2, noise_margin_db=0.0)
+    pipeline = VoicePipeline(LoudnessVad(), asr, endpointer, AudioRingBuffer(10, RATE),
+                             frame_samples=FRAME, streaming=streaming, step_seconds=100)
+    preroll = tone(8000, level=1000)
+    capture = FrameCapture(np.concatenate([tone(3 * FRAME), np.zeros(20 * FRAME, dtype=np.int16)]))
+    assert pipeline.listen(capture, preroll=preroll)
+    text = pipeline.transcribe(pipeline.speech())
+    return asr, text
+
+def test_preroll_reaches_the_final_decode():
+    for streaming in (True, False):
+        asr, text = run_with_preroll(streaming)
+        assert text == "stop the music"
+        decoded = np.concatenate(asr.decoded)
+        # The preroll's samples (level 1000) lead the decoded audio
+        assert np.allclose(decoded[:8000], 1000 / 32768)
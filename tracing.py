@@ -0,0 +1,181 @@
+# Per-interaction latency tracing with JSONL and Prometheus-text export
+import collections
+import contextlib
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+class Trace:
+    # One interaction: named spans (offset and duration in ms from the start
+    # of the trace) plus aggregated observations such as per-frame VAD
+    # confidence. Spans may be recorded from any thread.
+    def __init__(self, trace_id, name):
+        self.id = trace_id
+        self.name = name
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.duration_ms = None
+        self.spans = []
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name, **attrs):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000, start=start, **attrs)
+
+    def record(self, name, duration_ms, start=None, **attrs):
+        # For durations measured elsewhere (e.g. summed per-frame VAD time)
+        offset = ((start or time.perf_counter()) - self._t0) * 1000
+        with self._lock:
+            self.spans.append({"name": name, "offset_ms": offset, "duration_ms": duration_ms, **attrs})
+
+    def observe(self, name, value):
+        with self._lock:
+            metric = self.metrics.setdefault(name, {"count": 0, "sum": 0.0, "max": float("-inf"), "last": 0.0})
+            metric["count"] += 1
+            metric["sum"] += value
+            metric["max"] = max(metric["max"], value)
+            metric["last"] = value
+
+    def finish(self):
+        self.duration_ms = (time.perf_counter() - self._t0) * 1000
+
+    def totals(self):
+        # Total milliseconds per span name, in first-seen order
+        totals = {}
+        with self._lock:
+            for span in self.spans:
+                totals[span["name"]] = totals.get(span["name"], 0.0) + span["duration_ms"]
+        return totals
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "id": self.id,
+                "name": self.name,
+                "started_at": self.started_at,
+                "duration_ms": self.duration_ms,
+                "spans": list(self.spans),
+                "metrics": {name: dict(metric, mean=metric["sum"] / metric["count"])
+                            for name, metric in self.metrics.items()},
+            }
+
+class Tracer:
+    # Keeps the current trace and a ring buffer of the last max_traces
+    # finished ones. Each finished trace is appended to jsonl_path if set,
+    # and passed to on_finish. span()/record()/observe() are no-ops while no
+    # trace is running, so instrumented code works with tracing idle.
+    def __init__(self, max_traces=100, jsonl_path=None, on_finish=None):
+        self.traces = collections.deque(maxlen=max_traces)
+        self.jsonl_path = jsonl_path
+        self.on_finish = on_finish
+        self.current = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def begin(self, name="interaction"):
+        if self.current:
+            self.finish()
+        self.current = Trace(next(self._ids), name)
+        return self.current
+
+    def finish(self):
+        trace, self.current = self.current, None
+        if trace is None:
+            return None
+        trace.finish()
+        self.add(trace)
+        return trace
+
+    def add(self, trace):
+        # Takes a finished trace, e.g. from another tracer (see on_finish)
+        with self._lock:
+            self.traces.append(trace)
+        if self.jsonl_path:
+            try:
+                with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(trace.to_dict()) + "\n")
+            except OSError as e:
+                print(f"⚠️ Could not write trace: {e}")
+        if self.on_finish:
+            self.on_finish(trace)
+
+    def span(self, name, **attrs):
+        trace = self.current
+        return trace.span(name, **attrs) if trace else contextlib.nullcontext()
+
+    def record(self, name, duration_ms, **attrs):
+        trace = self.current
+        if trace:
+            trace.record(name, duration_ms, **attrs)
+
+    def observe(self, name, value):
+        trace = self.current
+        if trace:
+            trace.observe(name, value)
+
+    def first_item(self, name, items):
+        # Passes items through, recording the wait for the first one (e.g.
+        # time to first LLM token) as a span
+        start = time.perf_counter()
+        first = True
+        for item in items:
+            if first:
+                self.record(name, (time.perf_counter() - start) * 1000, start=start)
+                first = False
+            yield item
+
+    def recent(self):
+        with self._lock:
+            return list(self.traces)
+
+    def summary(self):
+        # {span name: {"count", "p50", "p90", "max"}} over the buffered traces
+        durations = collections.defaultdict(list)
+        for trace in self.recent():
+            for name, total in trace.totals().items():
+                durations[name].append(total)
+            if trace.duration_ms is not None:
+                durations["total"].append(trace.duration_ms)
+        return {name: {"count": len(values),
+                       "p50": float(np.percentile(values, 50)),
+                       "p90": float(np.percentile(values, 90)),
+                       "max": float(max(values))}
+                for name, values in durations.items()}
+
+    def prometheus_text(self, prefix="voice_assist"):
+        lines = [f"# HELP {prefix}_stage_latency_ms Stage latency per interaction over the last {self.traces.maxlen} traces",
+                 f"# TYPE {prefix}_stage_latency_ms summary"]
+        for name, stats in self.summary().items():
+            for quantile, key in (("0.5", "p50"), ("0.9", "p90"), ("1", "max")):
+                lines.append(f'{prefix}_stage_latency_ms{{stage="{name}",quantile="{quantile}"}} {stats[key]:.3f}')
+            lines.append(f'{prefix}_stage_latency_ms_count{{stage="{name}"}} {stats["count"]}')
+        return "\n".join(lines) + "\n"
+
+def serve_metrics(tracer, port, host="127.0.0.1"):
+    # Serves tracer.prometheus_text() at /metrics on a daemon thread
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = tracer.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
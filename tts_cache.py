@@ -0,0 +1,116 @@
+# Synthesized speech cache: in-memory LRU in front of a size-capped disk store
+import collections
+import hashlib
+import os
+import threading
+import wave
+
+class TTSCache:
+    # Values are (pcm_bytes, rate, channels, sampwidth), as returned by
+    # tts_client.synthesize.
+    def __init__(self, directory=None, max_memory_bytes=32 * 1024 * 1024,
+                 max_disk_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = collections.OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(text, speaker_id="", language_id="", engine="coqui"):
+        raw = "\0".join((engine, speaker_id or "", language_id or "", text.strip()))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.wav")
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        value = self._load(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if self.directory:
+            self._save(key, value)
+
+    def _remember(self, key, value):
+        size = len(value[0])
+        if size > self.max_memory_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._memory_bytes -= len(self._entries.pop(key)[0])
+            self._entries[key] = value
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._memory_bytes -= len(evicted[0])
+
+    def _load(self, key):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with wave.open(path, 'rb') as wf:
+                value = (wf.readframes(wf.getnframes()),
+                         wf.getframerate(),
+                         wf.getnchannels(),
+                         wf.getsampwidth())
+            os.utime(path)  # mtime doubles as last-used time for disk eviction
+            return value
+        except (OSError, EOFError, wave.Error):
+            return None
+
+    def _save(self, key, value):
+        pcm, rate, channels, sampwidth = value
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with wave.open(tmp_path, 'wb') as wf:
+                wf.setnchannels(channels)
+                wf.setsampwidth(sampwidth)
+                wf.setframerate(rate)
+                wf.writeframes(pcm)
+            os.replace(tmp_path, path)
+            self._evict_disk()
+        except OSError as e:
+            print(f"⚠️ TTS cache write error: {e}")
+
+    def _evict_disk(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".wav"):
+                stat = os.stat(os.path.join(self.directory, name))
+                files.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+
+    def prewarm(self, texts, synthesize_fn, **key_parts):
+        # synthesize_fn(text) -> value; skips phrases that are already cached
+        for text in texts:
+            key = self.key(text, **key_parts)
+            if self.get(key) is not None:
+                continue
+            try:
+                self.put(key, synthesize_fn(text))
+            except Exception as e:
+                print(f"⚠️ TTS prewarm failed for '{text}': {e}")
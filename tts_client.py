@@ -0,0 +1,20 @@
+# Coqui TTS client
+import io
+import wave
+
+def synthesize(client, url, text, speaker_id="p228", language_id="", timeout=None):
+    # Returns (pcm_bytes, rate, channels, sampwidth)
+    response = client.get(url,
+                          params={"text": text,
+                                  "speaker_id": speaker_id,
+                                  "style_wav": "",
+                                  "language_id": language_id},
+                          headers={"accept": "audio/wav"},
+                          timeout=timeout)
+    response.raise_for_status()
+    with io.BytesIO(response.content) as buffer:
+        with wave.open(buffer, 'rb') as wf:
+            return (wf.readframes(wf.getnframes()),
+                    wf.getframerate(),
+                    wf.getnchannels(),
+                    wf.getsampwidth())
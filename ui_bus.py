@@ -0,0 +1,54 @@
+# Worker threads -> Tk: latest values only, drawn at a fixed rate
+import threading
+
+class UIBus:
+    # Worker threads publish() values (meter levels, status text, ...) into
+    # one shared slot per name, which costs them a dict update under a lock
+    # and never touches a widget. The Tk main loop polls the slots fps times
+    # a second and, if anything changed, calls redraw(changed) once with the
+    # newest value of each changed name. Values published in between are
+    # coalesced, so the event queue sees one redraw per tick at most.
+    def __init__(self, root, redraw, fps=25):
+        self.root = root
+        self.redraw = redraw
+        self.interval_ms = max(1, int(1000 / fps))
+        self.published = 0
+        self.redraws = 0
+        self._values = {}
+        self._lock = threading.Lock()
+        self._running = False
+
+    def publish(self, **values):
+        with self._lock:
+            self._values.update(values)
+            self.published += 1
+
+    def apply(self, **values):
+        # Tk thread: redraws these values right away (e.g. disabling a button
+        # in its own click handler) and drops older published ones for them
+        with self._lock:
+            for name in values:
+                self._values.pop(name, None)
+        self.redraw(values)
+
+    def start(self):
+        # Call from the Tk thread
+        self._running = True
+        self.root.after(self.interval_ms, self._tick)
+        return self
+
+    def stop(self):
+        self._running = False
+
+    def _tick(self):
+        if not self._running:
+            return
+        with self._lock:
+            changed, self._values = self._values, {}
+        if changed:
+            self.redraws += 1
+            try:
+                self.redraw(changed)
+            except Exception as e:
+                print(f"⚠️ UI redraw error: {e}")
+        self.root.after(self.interval_ms, self._tick)
@@ -0,0 +1,50 @@
+# Silero VAD scoring with per-frame levels
+import numpy as np
+import torch
+
+class VadEngine:
+    # Silero is recurrent, so frames of one stream cannot go through the batch
+    # dimension; each frame is one model call under inference_mode. Frames may
+    # be held back and synced to Python batch_frames at a time, but that only
+    # saves the .tolist() and delays every decision by batch_frames - 1 frames,
+    # so the default scores each frame as it arrives. push() returns
+    # (confidence, rms) per frame, so the level always belongs to the frame
+    # that was scored.
+    def __init__(self, model, sample_rate=16000, num_samples=512, batch_frames=1):
+        self.model = model
+        self.sample_rate = sample_rate
+        self.num_samples = num_samples
+        self.batch_frames = batch_frames
+        self._frames = np.zeros((batch_frames, num_samples), dtype=np.float32)
+        self._rms = np.zeros(batch_frames, dtype=np.float32)
+        self._pending = 0
+
+    def reset(self):
+        self._pending = 0
+        self.model.reset_states()
+
+    def push(self, audio_float32):
+        # Returns (confidence, rms) of every frame scored by this call, in order
+        frame = self._frames[self._pending]
+        frame[:len(audio_float32)] = audio_float32
+        frame[len(audio_float32):] = 0
+        self._rms[self._pending] = np.sqrt(np.mean(frame**2))
+        self._pending += 1
+        if self._pending < self.batch_frames:
+            return []
+        return self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return []
+        frames = torch.from_numpy(self._frames[:self._pending])
+        with torch.inference_mode():
+            probs = [self.model(frame, self.sample_rate) for frame in frames]
+        levels = self._rms[:self._pending].tolist()
+        self._pending = 0
+        return list(zip(torch.cat(probs).flatten().tolist(), levels))
+
+    def score(self, frames):
+        for frame in frames:
+            yield from self.push(frame)
+        yield from self.flush()
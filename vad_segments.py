@@ -0,0 +1,30 @@
+# Speech regions from per-frame VAD confidences
+import numpy as np
+
+def speech_segments(confidences, threshold=0.5, frame_samples=512, pad_frames=6,
+                    merge_gap_frames=15, min_speech_frames=3):
+    # Returns [(start_sample, end_sample), ...] of voiced audio. Runs shorter
+    # than min_speech_frames are dropped as clicks, each run is padded by
+    # pad_frames, and runs closer than merge_gap_frames are joined.
+    voiced = np.asarray(confidences) >= threshold
+    if not voiced.any():
+        return []
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+    segments = []
+    for start, end in zip(edges[::2], edges[1::2]):
+        if end - start < min_speech_frames:
+            continue
+        start = max(0, start - pad_frames)
+        end = min(len(voiced), end + pad_frames)
+        if segments and start - segments[-1][1] <= merge_gap_frames:
+            segments[-1][1] = end
+        else:
+            segments.append([start, end])
+    return [(int(start) * frame_samples, int(end) * frame_samples) for start, end in segments]
+
+def collect_speech(audio, segments):
+    # A single segment is returned as a view; several are joined once
+    if len(segments) == 1:
+        start, end = segments[0]
+        return audio[start:end]
+    return np.concatenate([audio[start:end] for start, end in segments])
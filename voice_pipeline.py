@@ -0,0 +1,112 @@
+# Capture -> VAD -> endpointing -> ASR for one utterance, without any UI
+import time
+from streaming_transcriber import StreamingTranscriber
+from vad_segments import collect_speech, speech_segments
+
+class VoicePipeline:
+    # Frames from an AudioCapture go into the ring buffer, through the VAD
+    # and the endpointer and, once speech has started, to the streaming
+    # transcriber. Afterwards only the voiced audio is transcribed: by the
+    # streaming transcriber, which only decodes the uncommitted tail, or with
+    # stream_tail=False in one decode of its own. The latter costs a full
+    # decode but carries no per-utterance prompt, so a TranscriptionScheduler
+    # can batch it with other clients' final decodes.
+    # on_frame(frame_index, confidence, rms) is called for every VAD frame and
+    # on_speech_start() once the endpointer first hears speech;
+    # timings collects per-stage milliseconds for the last utterance.
+    def __init__(self, vad, asr, endpointer, buffer, frame_samples=512, threshold=0.5,
+                 streaming=True, stream_tail=True, trim_silence=True, pad_frames=6, merge_gap_frames=15,
+                 step_seconds=1.0, on_partial=None, on_stable=None, on_frame=None,
+                 on_speech_start=None):
+        self.vad = vad
+        self.asr = asr
+        self.endpointer = endpointer
+        self.buffer = buffer
+        self.frame_samples = frame_samples
+        self.threshold = threshold
+        self.streaming = streaming
+        self.stream_tail = stream_tail
+        self.trim_silence = trim_silence
+        self.pad_frames = pad_frames
+        self.merge_gap_frames = merge_gap_frames
+        self.step_seconds = step_seconds
+        self.on_partial = on_partial
+        self.on_stable = on_stable
+        self.on_frame = on_frame
+        self.on_speech_start = on_speech_start
+        self.transcriber = None
+        self.confidences = []
+        self.timings = {}
+
+    def listen(self, capture, preroll=None, keep_listening=None):
+        # Records until the endpointer fires or keep_listening() turns false;
+        # returns the endpointer's reason ("" if stopped from outside)
+        self.buffer.clear()
+        self.confidences = []
+        self.timings = {"vad_ms": [], "transcribe_ms": []}
+        if self.streaming:
+            # Built before the preroll is written, so its audio is transcribed too
+            self.transcriber = StreamingTranscriber(self.asr.segments, self.buffer,
+                                                    step_seconds=self.step_seconds,
+                                                    on_partial=self.on_partial,
+                                                    tail_fn=self.asr.transcribe,
+                                                    on_stable=self.on_stable)
+            self.transcriber.start()
+        if preroll is not None:
+            self.buffer.write(preroll)
+            # The preroll is speech by definition; keep frame i aligned with sample i * frame_samples
+            self.confidences = [1.0] * -(-len(preroll) // self.frame_samples)
+        self.vad.reset()
+        self.endpointer.reset(speech_detected=preroll is not None)
+
+        frame_index = 0
+        speech_started = bool(self.confidences)
+        while keep_listening is None or keep_listening():
+            samples = self.buffer.write(capture.read())
+            if self.transcriber and speech_started:
+                self.transcriber.feed()
+            start = time.perf_counter()
+            scored = self.vad.push(samples)
+            self.timings["vad_ms"].append((time.perf_counter() - start) * 1000)
+            for confidence, rms in scored:
+                self.confidences.append(confidence)
+                if self.on_frame:
+                    self.on_frame(frame_index, confidence, rms)
+                frame_index += 1
+                if self.endpointer.update(confidence, rms):
+                    return self.endpointer.reason
+                if not speech_started and self.endpointer.speech_detected:
+                    speech_started = True
+                    if self.on_speech_start:
+                        self.on_speech_start()
+                    if self.transcriber and self.trim_silence:
+                        onset = len(self.confidences) - 1 - self.pad_frames
+                        self.transcriber.start_at(max(0, onset) * self.frame_samples)
+        return ""
+
+    def speech(self):
+        # Voiced regions of the last utterance as absolute sample indices
+        if not len(self.buffer):
+            return []
+        if not self.trim_silence:
+            return [(0, self.buffer.total_written)]
+        return speech_segments(self.confidences, self.threshold, self.frame_samples,
+                               self.pad_frames, self.merge_gap_frames)
+
+    def transcribe(self, speech):
+        start = time.perf_counter()
+        if self.transcriber and self.stream_tail:
+            text = self.transcriber.finish(end=speech[-1][1])
+        else:
+            if self.transcriber:
+                self.transcriber.cancel()
+            # Segments are absolute sample indices; the ring may have dropped the oldest audio
+            offset = self.buffer.start
+            voiced = [(max(0, s - offset), max(0, e - offset)) for s, e in speech]
+            text = self.asr.transcribe(collect_speech(self.buffer.float32(), voiced))
+        self.timings["transcribe_ms"].append((time.perf_counter() - start) * 1000)
+        return text
+
+    def cancel(self):
+        if self.transcriber:
+            self.transcriber.cancel()
@@ -0,0 +1,28 @@
+# Wake phrase spotting for always-on listening
+import json
+import vosk
+
+class WakeWordSpotter:
+    # A Vosk recognizer restricted to the wake phrase plus [unk] is small and
+    # cheap enough to run on every voiced frame.
+    def __init__(self, model, wake_phrase, sample_rate=16000):
+        self.wake_phrase = wake_phrase.lower()
+        grammar = json.dumps([self.wake_phrase, "[unk]"])
+        self.recognizer = vosk.KaldiRecognizer(model, sample_rate, grammar)
+
+    def accept(self, pcm_bytes):
+        # Feed int16 PCM; returns True once the wake phrase has been heard
+        if self.recognizer.AcceptWaveform(pcm_bytes):
+            text = json.loads(self.recognizer.Result()).get("text", "")
+        else:
+            text = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        if self.wake_phrase in text:
+            self.reset()
+            return True
+        return False
+
+    def reset(self):
+        self.recognizer.Reset()
+
+def load_spotter(model_path, wake_phrase, sample_rate=16000):
+    return WakeWordSpotter(vosk.Model(model_path), wake_phrase, sample_rate)